@@ -0,0 +1,189 @@
+"""Conteo y muestreo uniforme de las cadenas aceptadas, por longitud.
+
+``M[i, j]`` es la cantidad de símbolos que llevan del estado vivo ``i`` al
+``j`` de una TablaDFA; las cadenas aceptadas de longitud ``n`` son
+``(M**n · f)[inicial]``, con ``f`` el indicador de los estados finales, y
+``M**n`` se calcula por cuadrados sucesivos. Los NFA se cuentan sobre su
+DFA por subconjuntos: en el NFA una cadena con varios caminos aceptadores
+se contaría varias veces.
+
+    python analitica.py pos --longitudes 0-8
+    python analitica.py contrasenas --longitudes 4-12 --muestras 5 --semilla 1
+"""
+import argparse
+import random
+import sys
+import numpy as np
+from generador import parse_lengths
+from validar_lote import VALIDATORS, build_table
+
+INT64_MAX = np.iinfo(np.int64).max
+
+
+class LanguageCounter:
+    """Cantidad de cadenas aceptadas por longitud y muestras uniformes de
+    una TablaDFA.
+
+    Solo entran a la matriz los estados vivos (``row < dead_from``): desde
+    los demás no se acepta nada. Se trabaja con ``int64`` mientras
+    ``|Σ|**n`` (cota de cualquier conteo de longitud ``n``) no desborde, y
+    con enteros de Python (arreglos ``object``) a partir de ahí.
+    """
+
+    def __init__(self, tabla, seed=None):
+        self.tabla = tabla
+        self.rng = random.Random(seed)
+        width = tabla.width
+        self.size = tabla.dead_from // width
+        self.initial = tabla.initial // width if tabla.initial < tabla.dead_from else None
+
+        self.matrix = np.zeros((self.size, self.size), dtype=np.int64)
+        for i in range(self.size):
+            for c, group in enumerate(tabla.classes):
+                target = tabla.table[i * width + c]
+                if target < tabla.dead_from:
+                    self.matrix[i, target // width] += len(group)
+        self.finals = np.zeros(self.size, dtype=np.int64)
+        for row in tabla.final:
+            self.finals[row // width] = 1
+
+        # Mayor longitud k con |Σ|**k <= INT64_MAX, calculada una vez.
+        n_symbols = len(tabla.symbols)
+        self.int64_lengths = sys.maxsize if n_symbols < 2 else 0
+        bound = n_symbols
+        while n_symbols > 1 and bound <= INT64_MAX:
+            self.int64_lengths += 1
+            bound *= n_symbols
+        self._object_matrix = None
+
+        # ``backward[k][i]``: cadenas de longitud k aceptadas desde el estado i.
+        self.backward = [self.finals]
+
+    def _matrix(self, length):
+        """``matrix`` en ``int64`` si los conteos de ``length`` caben, o su
+        copia ``object`` (enteros de Python), convertida una sola vez."""
+        if length <= self.int64_lengths:
+            return self.matrix
+        if self._object_matrix is None:
+            self._object_matrix = self.matrix.astype(object)
+        return self._object_matrix
+
+    def count(self, length):
+        """Cadenas aceptadas de exactamente ``length`` símbolos."""
+        if self.initial is None:
+            return 0
+        power = self._matrix(length)
+        vector = self.finals.astype(power.dtype)
+        n = length
+        while n:
+            if n & 1:
+                vector = power @ vector
+            n >>= 1
+            if n:
+                power = power @ power
+        return int(vector[self.initial])
+
+    def counts(self, max_length):
+        """Lista con las cantidades para las longitudes ``0..max_length``."""
+        self._extend(max_length)
+        if self.initial is None:
+            return [0] * (max_length + 1)
+        return [int(self.backward[k][self.initial]) for k in range(max_length + 1)]
+
+    def _extend(self, length):
+        # Un producto matriz-vector por longitud; el tipo cambia a ``object``
+        # en la primera longitud que podría desbordar.
+        while len(self.backward) <= length:
+            matrix = self._matrix(len(self.backward))
+            previous = self.backward[-1]
+            if previous.dtype != matrix.dtype:
+                previous = previous.astype(object)
+            self.backward.append(matrix @ previous)
+
+    def sample(self, length):
+        """Cadena aceptada de ``length`` símbolos, elegida con probabilidad
+        uniforme entre todas las de esa longitud."""
+        self._extend(length)
+        if self.initial is None or not self.backward[length][self.initial]:
+            raise ValueError(f"el autómata no acepta cadenas de longitud {length}")
+
+        tabla = self.tabla
+        width = tabla.width
+        rng = self.rng
+        row = self.initial
+        out = []
+        for remaining in range(length, 0, -1):
+            # Cada clase pesa (símbolos de la clase) x (cadenas aceptadas
+            # desde su destino con los símbolos que quedan).
+            ahead = self.backward[remaining - 1]
+            pick = rng.randrange(int(self.backward[remaining][row]))
+            for c, group in enumerate(tabla.classes):
+                target = tabla.table[row * width + c]
+                if target >= tabla.dead_from:
+                    continue
+                weight = len(group) * int(ahead[target // width])
+                if pick < weight:
+                    out.append(group[pick // int(ahead[target // width])])
+                    row = target // width
+                    break
+                pick -= weight
+        return ''.join(out)
+
+    def sample_lengths(self, lengths):
+        """Cadena uniforme entre todas las aceptadas con longitud en
+        ``lengths``: cada longitud se sortea según su cantidad."""
+        lengths = sorted(lengths)
+        counts = self.counts(lengths[-1])
+        total = sum(counts[length] for length in lengths)
+        if not total:
+            raise ValueError("el autómata no acepta cadenas de ninguna de las longitudes pedidas")
+        pick = self.rng.randrange(total)
+        for length in lengths:
+            if pick < counts[length]:
+                return self.sample(length)
+            pick -= counts[length]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Cuenta las cadenas aceptadas por longitud y toma muestras uniformes.")
+    parser.add_argument('automata', choices=VALIDATORS)
+    parser.add_argument('--longitudes', type=lambda spec: sorted(parse_lengths(spec)), default='0-20',
+                        help="longitudes a contar: 'A-B' o 'L'")
+    parser.add_argument('--muestras', type=int, default=0,
+                        help="cadenas aceptadas a sortear entre esas longitudes")
+    parser.add_argument('--semilla', type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Los conteos son exactos y pueden tener decenas de miles de dígitos;
+    # desde Python 3.11 ``str(int)`` se corta en 4300 sin esto.
+    if hasattr(sys, 'set_int_max_str_digits'):
+        sys.set_int_max_str_digits(0)
+    # La minimización no cambia el lenguaje y achica la matriz.
+    counter = LanguageCounter(build_table(args.automata, minimizar=True), args.semilla)
+    n_symbols = len(counter.tabla.symbols)
+
+    counts = counter.counts(args.longitudes[-1])
+    print("longitud\tcadenas\tfraccion")
+    # |Σ|**longitud se actualiza de una longitud a la siguiente.
+    total, previous = 1, 0
+    for length in args.longitudes:
+        total *= n_symbols ** (length - previous)
+        previous = length
+        print(f"{length}\t{counts[length]}\t{counts[length] / total:.6g}")
+
+    if args.muestras:
+        try:
+            for _ in range(args.muestras):
+                print(counter.sample_lengths(args.longitudes))
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
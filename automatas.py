@@ -0,0 +1,103 @@
+"""Definiciones de los autómatas de los talleres, sin dependencias de la GUI.
+
+Los visores (Ejercicio1.py, "Ejercicio 2 Fin.py", "Ejercicio 3.py" y
+contraseñas.py) y las herramientas de línea de comandos construyen sus
+máquinas desde aquí, para poder usarlas en un servidor sin pantalla.
+"""
+import string
+from automata.fa.dfa import DFA
+from automata.fa.nfa import NFA
+
+
+def l1_dfa():
+    """L1 = { w ∈ {a, b}* | #a(w) ≥ 2 ∧ bb ∉ w ∧ w termina en a }"""
+    return DFA(
+        states={'q0', 'q1', 'q2', 'q3', 'q4', 'q5', 'q6'},
+        input_symbols={'a', 'b'},
+        transitions={
+            'q0': {'a': 'q2', 'b': 'q1'},
+            'q1': {'a': 'q3', 'b': 'q6'},
+            'q2': {'a': 'q4', 'b': 'q5'},
+            'q3': {'a': 'q4', 'b': 'q5'},
+            'q4': {'a': 'q4', 'b': 'q5'},
+            'q5': {'a': 'q4', 'b': 'q6'},
+            'q6': {'a': 'q6', 'b': 'q6'}
+        },
+        initial_state='q0',
+        final_states={'q4'}
+    )
+
+
+def pos_dfa():
+    """Códigos de punto de venta (POS): dos letras, tres dígitos sin 00 y una letra."""
+    letters = set(string.ascii_uppercase)
+    digits_1_9 = set('123456789')
+    zero = {'0'}
+
+    return DFA(
+        states={'C0', 'C1', 'C2', 'C3', 'C4', 'C5', 'C6', 'C7', 'C8', 'CX'},
+        input_symbols=letters | digits_1_9 | zero,
+        transitions={
+            'C0': {**{letter: 'C1' for letter in letters}, **{digit: 'CX' for digit in digits_1_9}, '0': 'CX'},
+            'C1': {**{letter: 'C2' for letter in letters}, **{digit: 'CX' for digit in digits_1_9}, '0': 'CX'},
+            'C2': {**{letter: 'CX' for letter in letters}, **{digit: 'C3' for digit in digits_1_9}, '0': 'C7'},
+            'C3': {**{letter: 'CX' for letter in letters}, **{digit: 'C4' for digit in digits_1_9}, '0': 'C8'},
+            'C4': {**{letter: 'CX' for letter in letters}, **{digit: 'C5' for digit in digits_1_9}, '0': 'C5'},
+            'C5': {**{letter: 'C6' for letter in letters}, **{digit: 'CX' for digit in digits_1_9}, '0': 'CX'},
+            'C6': {**{letter: 'CX' for letter in letters}, **{digit: 'CX' for digit in digits_1_9}, '0': 'CX'},
+            'C7': {**{letter: 'CX' for letter in letters}, **{digit: 'C4' for digit in digits_1_9}, '0': 'CX'},
+            'C8': {**{letter: 'CX' for letter in letters}, **{digit: 'C5' for digit in digits_1_9}, '0': 'CX'},
+            'CX': {**{letter: 'CX' for letter in letters}, **{digit: 'CX' for digit in digits_1_9}, '0': 'CX'}
+        },
+        initial_state='C0',
+        final_states={'C6'}
+    )
+
+
+def binary_dfa():
+    """L = { w ∈ {0, 1}* | al menos siete unos ∧ w termina en 1 }"""
+    return DFA(
+        states={'F0', 'F1', 'F2', 'F3', 'F4', 'F5', 'F6', 'F7'},
+        input_symbols={'1', '0'},
+        transitions={
+            'F0': {'1': 'F1', '0': 'F0'},
+            'F1': {'1': 'F2', '0': 'F1'},
+            'F2': {'1': 'F3', '0': 'F2'},
+            'F3': {'1': 'F4', '0': 'F3'},
+            'F4': {'1': 'F5', '0': 'F4'},
+            'F5': {'1': 'F6', '0': 'F5'},
+            'F6': {'1': 'F7', '0': 'F6'},
+            'F7': {'1': 'F7', '0': 'F6'}
+        },
+        initial_state='F0',
+        final_states={'F7'}
+    )
+
+
+def password_nfa():
+    """Contraseñas temporales: una mayúscula, minúsculas opcionales y dígitos."""
+    letters_upper = set(string.ascii_uppercase)
+    letters_lower = set(string.ascii_lowercase)
+    digits = set(string.digits)
+
+    return NFA(
+        states={'P1', 'P2', 'P3', 'P4'},
+        input_symbols=letters_upper | letters_lower | digits,
+        transitions={
+            'P1': {ch: {'P2', 'P4'} for ch in letters_upper},
+            'P2': {ch: {'P2'} for ch in letters_lower} |
+                  {ch: {'P3'} for ch in digits},
+            'P3': {ch: {'P3'} for ch in digits},
+            'P4': {ch: {'P3'} for ch in digits},
+        },
+        initial_state='P1',
+        final_states={'P3'}
+    )
+
+
+AUTOMATAS = {
+    'l1': l1_dfa,
+    'pos': pos_dfa,
+    'binario': binary_dfa,
+    'contrasenas': password_nfa,
+}
@@ -0,0 +1,222 @@
+"""Banco de pruebas de rendimiento de los validadores.
+
+Valida un corpus sintético de ``generador.py`` (de tamaño y proporción de
+aceptadas configurables, reproducible con ``--semilla``) con cada autómata y cada
+motor, y reporta cadenas por segundo, ns por carácter, memoria máxima (RSS)
+y tiempo de arranque. Cada combinación corre en un proceso aparte para que
+la memoria y el arranque no se mezclen entre motores; el arranque mide solo
+lo que necesita cada motor: construir el autómata de automata-lib, o cargar
+la tabla ya compilada (``TablaDFA.load``) y, para ``codigo``, generar el
+matcher.
+
+    python benchmark.py -n 50000 --aceptadas 0.3 -o bench.json
+    python benchmark.py --motores automata-lib tabla --comparar bench.json
+
+Motores: ``automata-lib`` (``accepts_input``, la línea base), ``tabla``
+(``TablaDFA.accepts``), ``codigo`` (matcher generado), ``bytes``
+(``TablaDFA.accepts_bytes``) y ``lote`` (``TablaDFA.accepts_batch``).
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+MACHINES = ['l1', 'pos', 'binario', 'contrasenas', 'correos']
+ENGINES = ['automata-lib', 'tabla', 'codigo', 'bytes', 'lote']
+
+
+def _max_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KiB; macOS, bytes.
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def load_automaton(name):
+    """Autómata original (DFA o NFA de automata-lib)."""
+    from automatas import AUTOMATAS
+    from correos import CorreoUPTC
+
+    if name == 'correos':
+        return CorreoUPTC().dfa
+    return AUTOMATAS[name]()
+
+
+def save_table(name, path):
+    """Compila el autómata ``name`` y guarda la tabla en ``path``."""
+    from validar_lote import build_table
+    build_table(name).save(path)
+
+
+def make_corpus(tabla, size, accepted_ratio, seed=0):
+    """Corpus de ``generador.CorpusGenerator``: paseos aceptados y
+    mutantes rechazados en la proporción pedida."""
+    from generador import CorpusGenerator
+    return list(CorpusGenerator(tabla, seed=seed).lines(size, 1 - accepted_ratio))
+
+
+def _baseline(automaton):
+    def accepts(s):
+        try:
+            return automaton.accepts_input(s)
+        except Exception:
+            return False
+    return accepts
+
+
+def build_engine(engine, machine, table_path):
+    """Prepara el motor desde cero y devuelve ``(validar, por_lote, prepara)``:
+    la función que valida, si recibe el corpus entero y cómo convertir el
+    corpus a su entrada. Los motores de tabla parten de la tabla guardada;
+    automata-lib construye su DFA (o NFA)."""
+    if engine == 'automata-lib':
+        return _baseline(load_automaton(machine)), False, None
+
+    from motor import TablaDFA
+    tabla = TablaDFA.load(table_path, use_mmap=False)
+    if engine == 'tabla':
+        return tabla.accepts, False, None
+    if engine == 'codigo':
+        from compilador import compile_matcher
+        return compile_matcher(tabla).accepts, False, None
+    if engine == 'bytes':
+        return tabla.accepts_bytes, False, lambda corpus: [s.encode('utf-8') for s in corpus]
+    if engine == 'lote':
+        tabla._batch_tables()
+        return tabla.accepts_batch, True, None
+    raise ValueError(f"motor desconocido: {engine}")
+
+
+def run_one(machine, engine, table_path, size, accepted_ratio, seed, repeat):
+    """Mide una combinación en el proceso actual (llamado en un hijo).
+
+    El arranque es solo la preparación del motor, importaciones incluidas:
+    el proceso es nuevo y el corpus se genera después.
+    """
+    started = time.perf_counter()
+    validate, batch, prepare = build_engine(engine, machine, table_path)
+    startup = time.perf_counter() - started
+
+    from motor import TablaDFA
+    corpus = make_corpus(TablaDFA.load(table_path), size, accepted_ratio, seed=seed)
+    n_chars = sum(map(len, corpus))
+    data = prepare(corpus) if prepare else corpus
+
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        if batch:
+            n_accepted = int(validate(data).sum())
+        else:
+            n_accepted = sum(1 for s in data if validate(s))
+        best = min(best, time.perf_counter() - started)
+
+    return {
+        'automata': machine,
+        'motor': engine,
+        'cadenas': len(corpus),
+        'caracteres': n_chars,
+        'aceptadas': n_accepted,
+        'segundos': best,
+        'cadenas_por_s': len(corpus) / best if best else None,
+        'ns_por_caracter': best / n_chars * 1e9 if n_chars else None,
+        'arranque_s': startup,
+        'rss_max_mb': _max_rss_mb(),
+    }
+
+
+def run_isolated(machine, engine, table_path, args):
+    """Corre ``run_one`` en un proceso nuevo y devuelve su resultado."""
+    job = json.dumps([machine, engine, table_path, args.cadenas, args.aceptadas, args.semilla,
+                      args.repeticiones])
+    process = subprocess.run([sys.executable, os.path.abspath(__file__), '--trabajo', job],
+                             capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+    if process.returncode != 0:
+        raise RuntimeError(f"{machine}/{engine}: {process.stderr.strip()}")
+    return json.loads(process.stdout)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous):
+    """Imprime la variación de ns/carácter respecto de un JSON anterior."""
+    before = {(r['automata'], r['motor']): r for r in previous['resultados']}
+    print(f"\nComparación con {previous.get('commit') or 'resultados anteriores'}:")
+    for r in results:
+        old = before.get((r['automata'], r['motor']))
+        if old and old['ns_por_caracter'] and r['ns_por_caracter']:
+            change = (r['ns_por_caracter'] / old['ns_por_caracter'] - 1) * 100
+            print(f"{r['automata']:12} {r['motor']:13} {old['ns_por_caracter']:9.1f} -> "
+                  f"{r['ns_por_caracter']:9.1f} ns/carácter ({change:+.1f}%)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el rendimiento de los validadores.")
+    parser.add_argument('-n', '--cadenas', type=int, default=20000,
+                        help="cadenas por corpus")
+    parser.add_argument('--aceptadas', type=float, default=0.5,
+                        help="proporción de cadenas aceptadas en el corpus (0 a 1)")
+    parser.add_argument('--semilla', type=int, default=0,
+                        help="semilla del generador de corpus")
+    parser.add_argument('--repeticiones', type=int, default=3,
+                        help="repeticiones por medición; se reporta la mejor")
+    parser.add_argument('--automatas', nargs='+', choices=MACHINES, default=MACHINES)
+    parser.add_argument('--motores', nargs='+', choices=ENGINES, default=ENGINES)
+    parser.add_argument('-o', '--salida', help="archivo JSON donde guardar los resultados")
+    parser.add_argument('--comparar', help="JSON de una corrida anterior para comparar")
+    parser.add_argument('--trabajo', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.trabajo:
+        print(json.dumps(run_one(*json.loads(args.trabajo))))
+        return 0
+
+    results = []
+    print(f"{'automata':12} {'motor':13} {'cadenas/s':>12} {'ns/car':>9} "
+          f"{'arranque':>9} {'RSS MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for machine in args.automatas:
+            table_path = os.path.join(tmp, f'{machine}.afd')
+            save_table(machine, table_path)
+            for engine in args.motores:
+                r = run_isolated(machine, engine, table_path, args)
+                results.append(r)
+                print(f"{machine:12} {engine:13} {r['cadenas_por_s']:12,.0f} "
+                      f"{r['ns_por_caracter']:9.1f} {r['arranque_s'] * 1000:7.1f}ms "
+                      f"{r['rss_max_mb']:8.1f}")
+
+    report = {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cadenas': args.cadenas,
+        'aceptadas': args.aceptadas,
+        'semilla': args.semilla,
+        'resultados': results,
+    }
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            compare(results, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
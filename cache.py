@@ -0,0 +1,83 @@
+"""Caché de resultados para entradas repetidas.
+
+Los archivos de correos y de códigos POS repiten las mismas cadenas miles
+de veces; ``ResultCache`` guarda el resultado de las más recientes (LRU)
+con un límite de entradas y otro de memoria aproximada, y
+``classify_dedup`` valida cada cadena distinta de un lote una sola vez.
+"""
+import sys
+from collections import OrderedDict
+
+MAX_ENTRIES = 100_000
+MAX_BYTES = 64 * 1024 * 1024
+# Costo aproximado de una entrada además de la clave: nodo del
+# OrderedDict, enlaces y el entero del resultado.
+ENTRY_OVERHEAD = 100
+
+
+class ResultCache:
+    """Envuelve una función de validación (``classify``, ``accepts``,
+    ``classify_bytes``...) con una caché LRU acotada.
+
+    Se usa igual que la función: ``cache(cadena)``. ``hits``, ``misses`` y
+    ``evictions`` cuentan aciertos, fallos y desalojos.
+    """
+
+    def __init__(self, compute, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.compute = compute
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __call__(self, key):
+        entries = self.entries
+        try:
+            result = entries[key]
+        except KeyError:
+            pass
+        else:
+            entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        result = self.compute(key)
+        entries[key] = result
+        self.bytes += sys.getsizeof(key) + ENTRY_OVERHEAD
+        while len(entries) > self.max_entries or self.bytes > self.max_bytes:
+            old, _ = entries.popitem(last=False)
+            self.bytes -= sys.getsizeof(old) + ENTRY_OVERHEAD
+            self.evictions += 1
+        return result
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'aciertos': self.hits,
+            'fallos': self.misses,
+            'desalojos': self.evictions,
+            'entradas': len(self.entries),
+            'bytes': self.bytes,
+            'tasa_aciertos': self.hits / lookups if lookups else 0.0,
+        }
+
+
+def classify_dedup(classify_batch, strings):
+    """Valida con ``classify_batch`` solo las cadenas distintas de
+    ``strings`` y reparte los resultados a sus posiciones originales."""
+    import numpy as np
+
+    positions = {}
+    inverse = np.fromiter((positions.setdefault(s, len(positions)) for s in strings),
+                          dtype=np.intp)
+    if len(positions) == len(inverse):
+        return classify_batch(list(positions))
+    return np.asarray(classify_batch(list(positions)))[inverse]
@@ -0,0 +1,161 @@
+"""Generación de código: convierte una TablaDFA en funciones de Python
+especializadas.
+
+Cada estado vivo se vuelve una rama ``if state == k`` con comparaciones de
+caracteres escritas en el código, y cualquier paso hacia un estado sin
+salida (desde el que ya no se puede aceptar) se vuelve un ``return``
+inmediato. El resultado se compila con ``compile``/``exec`` una sola vez
+por tabla y se guarda en caché.
+"""
+import hashlib
+from motor import ACCEPTED, REJECTED, ERROR
+
+_cache = {}
+
+
+class CompiledMatcher:
+    """Funciones ``accepts`` y ``classify`` generadas para una tabla; se
+    usan igual que los métodos del mismo nombre de TablaDFA."""
+
+    def __init__(self, source, namespace):
+        self.source = source
+        self.accepts = namespace['accepts']
+        self.classify = namespace['classify']
+
+
+def _dead_rows(tabla):
+    """Filas desde las que no se alcanza ningún estado final."""
+    return set(range(tabla.dead_from // tabla.width, len(tabla.table) // tabla.width))
+
+
+def _body(tabla, dead, on_reject):
+    """Líneas del bucle principal; ``on_reject`` es la sentencia que se
+    emite cuando la cadena ya no puede aceptarse."""
+    width = tabla.width
+    n_rows = len(tabla.table) // width
+    constants = {}
+
+    def state_block(row, indent):
+        by_target = {}
+        for c, group in enumerate(tabla.classes):
+            target = tabla.table[row * width + c] // width
+            if target not in dead:
+                by_target.setdefault(target, []).extend(group)
+
+        lines = []
+        branch = 'if'
+        for target, symbols in sorted(by_target.items()):
+            if len(symbols) == 1:
+                test = f"ch == {symbols[0]!r}"
+            else:
+                name = f"_S{len(constants)}"
+                constants[name] = frozenset(symbols)
+                test = f"ch in {name}"
+            lines.append(f"{indent}{branch} {test}:")
+            lines.append(f"{indent}    state = {target}" if target != row else f"{indent}    pass")
+            branch = 'elif'
+        if branch == 'if':
+            lines.append(f"{indent}{on_reject}")
+        else:
+            lines.append(f"{indent}else:")
+            lines.append(f"{indent}    {on_reject}")
+        return lines
+
+    def dispatch(rows, indent):
+        # Árbol binario de comparaciones: log2(n) pruebas por carácter en
+        # lugar de una cadena de n ``elif``.
+        if len(rows) == 1:
+            return state_block(rows[0], indent)
+        mid = len(rows) // 2
+        return ([f"{indent}if state < {rows[mid]}:"] + dispatch(rows[:mid], indent + "    ") +
+                [f"{indent}else:"] + dispatch(rows[mid:], indent + "    "))
+
+    # Los pocos estados con lazos sobre sí mismos consumen la mayor parte
+    # de los caracteres (p. ej. la parte local de un correo): se prueban
+    # primero. Si casi todos tienen lazo, el árbol binario rinde más.
+    live = [row for row in range(n_rows) if row not in dead]
+    loops = [row for row in live if row * width in tabla.table[row * width:(row + 1) * width]]
+    if len(loops) > 2:
+        loops = []
+    rest = [row for row in live if row not in loops]
+
+    lines = []
+    keyword = 'if'
+    for row in loops:
+        lines.append(f"        {keyword} state == {row}:")
+        lines.extend(state_block(row, "            "))
+        keyword = 'elif'
+    if rest and loops:
+        lines.append("        else:")
+        lines.extend(dispatch(rest, "            "))
+    elif rest:
+        lines.extend(dispatch(rest, "        "))
+    return lines, constants
+
+
+def generate_source(tabla):
+    """Devuelve ``(source, constants)``: el código de ``accepts`` y
+    ``classify`` y los conjuntos de símbolos que referencia."""
+    width = tabla.width
+    dead = _dead_rows(tabla)
+    initial = tabla.initial // width
+    finals = sorted(offset // width for offset in tabla.final)
+
+    # Al llegar a un estado sin salida, classify aún debe distinguir los
+    # símbolos inválidos del resto de la cadena: basta un issuperset en C.
+    classify_reject = "return REJECTED if _ALPHABET.issuperset(cadena) else ERROR"
+    accepts_body, constants = _body(tabla, dead, "return False")
+    classify_body, _ = _body(tabla, dead, classify_reject)
+    constants['_ALPHABET'] = frozenset(tabla.symbols)
+    constants['_FINAL'] = frozenset(finals)
+
+    source = []
+    for name, body, reject, result in (
+            ('accepts', accepts_body, "return False", "state in _FINAL"),
+            ('classify', classify_body, classify_reject,
+             "ACCEPTED if state in _FINAL else REJECTED")):
+        source.append(f"def {name}(cadena):")
+        if initial in dead:
+            source.append(f"    {reject}")
+        else:
+            source.append(f"    state = {initial}")
+            source.append("    for ch in cadena:")
+            source.extend(body)
+            source.append(f"    return {result}")
+        source.append("")
+    return "\n".join(source), constants
+
+
+def compile_matcher(tabla):
+    """Genera, compila y guarda en caché el matcher de ``tabla``."""
+    key = hashlib.sha256(repr((list(tabla.table), sorted(tabla.final), tabla.initial,
+                               tabla.classes)).encode('utf-8')).hexdigest()
+    if key not in _cache:
+        source, constants = generate_source(tabla)
+        namespace = dict(constants, ACCEPTED=ACCEPTED, REJECTED=REJECTED, ERROR=ERROR)
+        exec(compile(source, f"<afd {key[:12]}>", 'exec'), namespace)
+        _cache[key] = CompiledMatcher(source, namespace)
+    return _cache[key]
+
+
+if __name__ == "__main__":
+    # Comparación rápida de los dos motores sobre cadenas aleatorias.
+    import random
+    import timeit
+    from automata.fa.nfa import NFA
+    from automatas import AUTOMATAS
+    from correos import CorreoUPTC
+    from motor import TablaDFA
+
+    machines = {name: build() for name, build in AUTOMATAS.items()}
+    machines['correos'] = CorreoUPTC().dfa
+    rng = random.Random(0)
+    for name, automaton in machines.items():
+        tabla = TablaDFA.from_nfa(automaton) if isinstance(automaton, NFA) else TablaDFA(automaton)
+        matcher = compile_matcher(tabla)
+        strings = [''.join(rng.choice(tabla.symbols) for _ in range(rng.randint(1, 20)))
+                   for _ in range(20000)]
+        n_chars = sum(map(len, strings))
+        for label, accepts in (('tabla', tabla.accepts), ('codigo', matcher.accepts)):
+            seconds = min(timeit.repeat(lambda: [accepts(s) for s in strings], number=1, repeat=3))
+            print(f"{name:12} {label:7} {seconds / n_chars * 1e9:8.1f} ns/carácter")
@@ -1,8 +1,19 @@
+import mmap
 import string
+import sys
 from automata.fa.dfa import DFA
+from cache import MAX_BYTES, MAX_ENTRIES, ResultCache, classify_dedup
+from metricas import Metricas
+from motor import TablaDFA, minimize
+
+# Sufijo literal de toda dirección aceptada; la búsqueda lo usa como ancla
+# y solo recorre el DFA alrededor de cada aparición.
+ANCLA = b'@uptc.edu.co'
+CHUNK_BYTES = 1 << 20
+MAX_LOCAL = 4096
 
 class CorreoUPTC:
-    def __init__(self):
+    def __init__(self, compilado=False, minimizar=False):
 
         letters_lower = set(string.ascii_lowercase)  
         digits = set(string.digits)                  
@@ -44,14 +55,60 @@ class CorreoUPTC:
             final_states={'q13'}
         )
 
+        # En modo compilado la validación recorre una tabla de enteros en
+        # lugar del DFA de automata-lib, minimizada si se pide.
+        self.tabla = TablaDFA(minimize(self.dfa) if minimizar else self.dfa)
+        self.compilado = compilado
+        self.metricas = None
+        self.cache = None
+
+    @classmethod
+    def desde_tabla(cls, path):
+        """Crea el validador (en modo compilado) desde una tabla guardada con
+           ``TablaDFA.save``, sin construir el DFA de automata-lib.
+        """
+        correo = cls.__new__(cls)
+        correo.tabla = TablaDFA.load(path)
+        correo.symbols = set(correo.tabla.symbols)
+        correo.dfa = None
+        correo.compilado = True
+        correo.metricas = None
+        correo.cache = None
+        return correo
+
+    def activar_metricas(self):
+        """Instrumenta ``validar`` con una ``metricas.Metricas`` sobre la
+           tabla y la devuelve; sin activarla la validación no cambia.
+        """
+        self.metricas = Metricas(self.tabla, 'correos')
+        return self.metricas
+
+    def activar_cache(self, max_entradas=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        """Pone una caché LRU acotada delante de ``validar`` y la devuelve;
+           sus contadores (``stats``) muestran cuánto se repiten las cadenas.
+        """
+        self.cache = ResultCache(self._validar, max_entradas, max_bytes)
+        return self.cache
+
     def validar(self, cadena: str) -> bool:
         """Valida la cadena:
            - devuelve False si contiene símbolos no permitidos (mayúsculas, espacios, etc.)
            - en caso contrario devuelve el resultado del DFA
         """
+        if self.cache is not None:
+            return self.cache(cadena)
+        return self._validar(cadena)
+
+    def _validar(self, cadena):
         if not cadena:
             return False
 
+        if self.metricas is not None:
+            return self.metricas.accepts(cadena)
+
+        if self.compilado:
+            return self.tabla.accepts(cadena)
+
         for ch in cadena:
             if ch not in self.symbols:
                 return False
@@ -61,10 +118,146 @@ class CorreoUPTC:
         except Exception:
             return False
 
+    def validar_bytes(self, datos) -> bool:
+        """Como ``validar`` pero sobre ``bytes``, ``bytearray`` o
+           ``memoryview``: cada byte pasa por la tabla de 256 entradas, sin
+           decodificar ni revisar el conjunto de símbolos carácter a carácter.
+        """
+        return len(datos) > 0 and self.tabla.accepts_bytes(datos)
+
+    def accepts_batch(self, cadenas, deduplicar=False):
+        """Valida una lista de cadenas de una vez; devuelve un arreglo bool
+           con el mismo resultado que ``validar`` para cada una. Con
+           ``deduplicar`` cada cadena distinta se valida una sola vez.
+        """
+        if deduplicar:
+            return classify_dedup(self.accepts_batch, cadenas)
+        import numpy as np
+
+        cadenas = list(cadenas)
+        return self.tabla.accepts_batch(cadenas) & np.fromiter(
+            map(bool, cadenas), dtype=bool, count=len(cadenas))
+
+    # --- búsqueda en texto --------------------------------------------
+
+    def _bytes_locales(self):
+        """Bytes con que puede empezar la parte local y bytes que la
+           continúan, leídos de la tabla: los símbolos que llevan del estado
+           inicial al estado de la parte local y los de su lazo.
+        """
+        if not hasattr(self, '_locales'):
+            tabla = self.tabla
+            def step(state, symbol):
+                return tabla.table[state + tabla.symbol_index[symbol]]
+            local = next(step(tabla.initial, s) for s in tabla.symbols
+                         if step(tabla.initial, s) < tabla.dead_from)
+            inicio = frozenset(ord(s) for s in tabla.symbols if step(tabla.initial, s) == local)
+            resto = frozenset(ord(s) for s in tabla.symbols if step(local, s) == local)
+            self._locales = (inicio, resto)
+        return self._locales
+
+    def _buscar_en(self, data, lo, limit):
+        """Busca en ``data[lo:limit]`` las direcciones cuyo ancla cabe antes
+           de ``limit``. ``lo`` es el final de la última coincidencia: la
+           parte local no puede empezar antes. Devuelve la lista de
+           ``(inicio, fin, direccion)`` y el nuevo ``lo``.
+        """
+        inicio, resto = self._bytes_locales()
+        encontrados = []
+        pos = data.find(ANCLA, lo, limit)
+        while pos != -1:
+            # Hacia atrás por la parte local (la más larga posible) y luego
+            # hacia adelante hasta un byte válido como primer carácter.
+            start = pos
+            while start > lo and data[start - 1] in resto:
+                start -= 1
+            while start < pos and data[start] not in inicio:
+                start += 1
+            end = pos + len(ANCLA)
+            if start < pos:
+                direccion = bytes(data[start:end]).decode('ascii')
+                if self.tabla.accepts(direccion):
+                    encontrados.append((start, end, direccion))
+                    lo = end
+            pos = data.find(ANCLA, end, limit)
+        return encontrados, lo
+
+    def buscar(self, texto):
+        """Devuelve las direcciones de ``texto`` (str o bytes) como tuplas
+           ``(inicio, fin, direccion)`` con desplazamientos en bytes (UTF-8
+           si es str). Las coincidencias son las más a la izquierda y más
+           largas, sin solaparse.
+        """
+        if isinstance(texto, str):
+            texto = texto.encode('utf-8')
+        return self._buscar_en(texto, 0, len(texto))[0]
+
+    def buscar_en_stream(self, f, chunk_size=CHUNK_BYTES, max_local=MAX_LOCAL):
+        """Genera las direcciones de un archivo binario leído por bloques,
+           con desplazamientos absolutos. Entre bloques se conserva la cola
+           que aún puede formar parte de una dirección (un ancla cortada o
+           una parte local de hasta ``max_local`` bytes), así que las
+           coincidencias que cruzan el borde de un bloque no se pierden.
+           Una dirección con la parte local más larga que ``max_local`` que
+           cruza un borde se omite: con la cola recortada solo se podría
+           informar un sufijo suyo, que no es la dirección del texto.
+        """
+        inicio, resto = self._bytes_locales()
+        continuacion = bytes(sorted(resto))
+        buf = b''
+        base = 0
+        lo = 0
+        # ``cortado``: ``buf`` empieza en medio de una parte local de la que
+        # se descartó el comienzo.
+        cortado = False
+        while True:
+            chunk = f.read(chunk_size)
+            buf += chunk
+            encontrados, lo = self._buscar_en(buf, lo, len(buf))
+            # El ancla de la parte local cortada es el primer byte que no la
+            # continúa.
+            ancla_cortada = len(buf) - len(buf.lstrip(continuacion)) if cortado else -1
+            for start, end, direccion in encontrados:
+                if end - len(ANCLA) != ancla_cortada:
+                    yield base + start, base + end, direccion
+            if not chunk:
+                return
+
+            # Cola que se conserva: el posible comienzo de un ancla más la
+            # parte local que la precede.
+            keep = max(lo, len(buf) - len(ANCLA) + 1)
+            floor = max(lo, keep - max_local)
+            while keep > floor and buf[keep - 1] in resto:
+                keep -= 1
+            cortado = (keep > lo and buf[keep - 1] in resto) or (keep == 0 and cortado)
+            buf = buf[keep:]
+            base += keep
+            lo = max(lo - keep, 0)
+
+    def buscar_en_archivo(self, path):
+        """Como ``buscar``, pero sobre un archivo proyectado en memoria."""
+        with open(path, 'rb') as f:
+            if not f.seek(0, 2):
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return self._buscar_en(data, 0, len(data))[0]
+
 
 if __name__ == "__main__":
     automata = CorreoUPTC()
 
+    # python correos.py registro.log [...]: extrae las direcciones de cada
+    # archivo ('-' para stdin) en lugar de abrir la consola interactiva.
+    if len(sys.argv) > 1:
+        for path in sys.argv[1:]:
+            if path == '-':
+                encontrados = automata.buscar_en_stream(sys.stdin.buffer)
+            else:
+                encontrados = automata.buscar_en_archivo(path)
+            for inicio, fin, direccion in encontrados:
+                print(f"{path}:{inicio}-{fin}\t{direccion}")
+        sys.exit(0)
+
   #  pruebas = [
       #  "juan3@uptc.edu.co",  
       #  "maria@uptc.edu.co",   
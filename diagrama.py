@@ -0,0 +1,140 @@
+"""Posiciones y aristas para dibujar autómatas en los visores.
+
+``layered_layout`` ubica los estados por capas según su distancia (BFS)
+desde el estado inicial y ordena cada capa por el baricentro de sus
+predecesores; es determinista y lineal en estados + transiciones, así que
+sirve para autómatas de miles de estados. ``cached_layout`` guarda el
+resultado en disco con el hash del grafo.
+"""
+import hashlib
+import json
+import os
+from collections import deque
+from motor import CACHE_DIR, cached_json, state_label, symbol_ranges
+
+LAYOUT_VERSION = 1
+# Subirla cuando cambie el estilo de las figuras de los visores, para no
+# mostrar PNG guardados con el estilo anterior.
+RENDER_VERSION = 2
+# Por encima de esta cantidad de aristas se dibujan rectas, sin flechas
+# curvas ni etiquetas: son las que más tardan en matplotlib.
+LARGE_GRAPH = 150
+
+
+def _targets(targets, states):
+    # Un DFA tiene un estado destino por símbolo; un NFA, un conjunto. Los
+    # estados de un NFA determinizado también son frozensets.
+    if isinstance(targets, (set, frozenset)) and targets not in states:
+        return targets
+    return (targets,)
+
+
+def edge_labels(automaton):
+    """Dict ``(origen, destino) -> etiqueta`` con los símbolos de cada
+    arista resumidos en rangos (``A-Z``, ``1-9``...)."""
+    grouped = {}
+    states = automaton.states
+    for source, transitions in automaton.transitions.items():
+        for symbol, targets in transitions.items():
+            for target in _targets(targets, states):
+                grouped.setdefault((source, target), set()).add(symbol)
+    labels = {}
+    for edge, symbols in grouped.items():
+        # '' es la transición épsilon de un NFA.
+        labels[edge] = ','.join((['ε'] if '' in symbols else []) +
+                                symbol_ranges(symbols - {''}))
+    return labels
+
+
+def layered_layout(automaton, dx=2.0, dy=1.5):
+    """Posiciones ``{estado: (x, y)}``: la capa (BFS desde el inicial) da la
+    x y el orden dentro de la capa, la y."""
+    successors = {state: [] for state in automaton.states}
+    predecessors = {state: [] for state in automaton.states}
+    for (source, target) in edge_labels(automaton):
+        if source != target:
+            successors[source].append(target)
+            predecessors[target].append(source)
+
+    layer = {automaton.initial_state: 0}
+    order = [automaton.initial_state]
+    pending = deque(order)
+    while pending:
+        state = pending.popleft()
+        for target in successors[state]:
+            if target not in layer:
+                layer[target] = layer[state] + 1
+                order.append(target)
+                pending.append(target)
+    last = max(layer.values()) + 1
+    for state in sorted(automaton.states, key=state_label):
+        if state not in layer:
+            layer[state] = last
+            order.append(state)
+
+    layers = {}
+    for state in order:
+        layers.setdefault(layer[state], []).append(state)
+
+    # Dos barridos de baricentro: cada estado se acerca a la altura media de
+    # sus predecesores en capas anteriores, lo que reduce los cruces.
+    rank = {}
+    for _ in range(2):
+        for index in sorted(layers):
+            states = layers[index]
+            for i, state in enumerate(states):
+                rank.setdefault(state, i)
+            def barycenter(state, index=index):
+                ranks = [rank[p] for p in predecessors[state] if layer[p] < index]
+                return sum(ranks) / len(ranks) if ranks else rank[state]
+            states.sort(key=barycenter)
+            for i, state in enumerate(states):
+                rank[state] = i
+
+    pos = {}
+    for index, states in layers.items():
+        offset = (len(states) - 1) / 2
+        for i, state in enumerate(states):
+            pos[state] = (index * dx, (offset - i) * dy)
+    return pos
+
+
+def _graph_key(automaton):
+    edges = sorted((state_label(source), state_label(target), label)
+                   for (source, target), label in edge_labels(automaton).items())
+    states = sorted(state_label(state) for state in automaton.states)
+    data = [LAYOUT_VERSION, state_label(automaton.initial_state), states, edges]
+    return hashlib.sha256(json.dumps(data).encode('utf-8')).hexdigest()
+
+
+def cached_layout(automaton, cache_dir=CACHE_DIR):
+    """``layered_layout`` con caché en disco, por hash del grafo."""
+    path = os.path.join(cache_dir, f'layout-{_graph_key(automaton)[:32]}.json') if cache_dir else None
+    by_label = {state_label(state): state for state in automaton.states}
+    return cached_json(
+        path, lambda: layered_layout(automaton),
+        lambda pos: {state_label(state): xy for state, xy in pos.items()},
+        lambda saved: {by_label[label]: tuple(xy) for label, xy in saved.items()})
+
+
+def figure_path(automaton, name, cache_dir=CACHE_DIR):
+    """Ruta del PNG del grafo de ``automaton`` dibujado por el visor
+    ``name``; cambia si cambia el autómata o ``RENDER_VERSION``."""
+    if not cache_dir:
+        return None
+    return os.path.join(cache_dir, f'{name}-r{RENDER_VERSION}-{_graph_key(automaton)[:32]}.png')
+
+
+def draw_edges(G, pos, ax):
+    """Dibuja las aristas de ``G`` (con atributo ``label``); en grafos
+    grandes, rectas sin etiquetas."""
+    import networkx as nx
+
+    if G.number_of_edges() > LARGE_GRAPH:
+        nx.draw_networkx_edges(G, pos, edge_color='gray', arrows=False, width=0.5, ax=ax)
+        return
+    nx.draw_networkx_edges(G, pos, edge_color='gray',
+                           connectionstyle="arc3,rad=0.1",
+                           arrows=True, arrowsize=20,
+                           arrowstyle='->', ax=ax)
+    nx.draw_networkx_edge_labels(G, pos, nx.get_edge_attributes(G, 'label'), font_size=9, ax=ax)
@@ -0,0 +1,164 @@
+"""Generador de corpus sintéticos a partir de los propios autómatas.
+
+Las cadenas aceptadas salen de paseos aleatorios ponderados por el grafo de
+transiciones (del DFA, o del DFA por subconjuntos en el caso de un NFA) con
+la longitud exacta pedida; las rechazadas son mutantes cercanos de una
+cadena aceptada: un símbolo cambiado, borrado, insertado o transpuesto.
+
+    python generador.py pos -n 1000000 -o pos.txt
+    python generador.py correos -n 200000 --longitud 5-40 --rechazadas 0.3
+    python generador.py contrasenas --longitud 4:1,8:3,12:1 --pesos clase
+"""
+import argparse
+import random
+import sys
+from validar_lote import VALIDATORS, build_table
+
+BATCH_LINES = 10000
+
+
+def parse_lengths(spec):
+    """``'A-B'`` (uniforme entre A y B), ``'L'`` o ``'L:peso,L:peso'``;
+    devuelve un dict longitud -> peso."""
+    if ':' in spec:
+        lengths = {}
+        for item in spec.split(','):
+            length, weight = item.split(':')
+            lengths[int(length)] = float(weight)
+        return lengths
+    low, _, high = spec.partition('-')
+    return {length: 1.0 for length in range(int(low), int(high or low) + 1)}
+
+
+class CorpusGenerator:
+    """Cadenas aceptadas y casi aceptadas de una TablaDFA.
+
+    ``reach[k]`` es el conjunto de filas desde las que se llega a un estado
+    final en exactamente ``k`` pasos; el paseo solo elige transiciones hacia
+    ``reach[restantes - 1]``, así que nunca hay que retroceder. Con
+    ``pesos='simbolo'`` cada símbolo pesa lo mismo (una clase de 26 letras
+    se elige 26 veces más que un '@'); con ``'clase'``, cada clase.
+    """
+
+    def __init__(self, tabla, lengths=None, pesos='simbolo', seed=None):
+        self.tabla = tabla
+        self.rng = random.Random(seed)
+        self.pesos = pesos
+        lengths = lengths or {length: 1.0 for length in range(1, 21)}
+
+        width = tabla.width
+        table = tabla.table
+        rows = range(0, tabla.dead_from, width)
+        self.reach = [set(tabla.final)]
+        for _ in range(max(lengths)):
+            previous = self.reach[-1]
+            self.reach.append({row for row in rows
+                               if any(table[row + c] in previous for c in range(tabla.n_classes))})
+
+        feasible = {length: weight for length, weight in lengths.items()
+                    if tabla.initial in self.reach[length]}
+        if not feasible:
+            raise ValueError("el autómata no acepta cadenas de ninguna de las longitudes pedidas")
+        self.lengths = list(feasible)
+        self.weights = list(feasible.values())
+        self._options = {}
+
+    def _choices(self, row, remaining):
+        key = (row, remaining)
+        if key not in self._options:
+            tabla = self.tabla
+            goal = self.reach[remaining - 1]
+            options = []
+            for c, group in enumerate(tabla.classes):
+                target = tabla.table[row + c]
+                if target in goal:
+                    if self.pesos == 'clase':
+                        options.append((group, target))
+                    else:
+                        options.extend(((symbol,), target) for symbol in group)
+            self._options[key] = options
+        return self._options[key]
+
+    def accepted(self, length=None):
+        """Cadena aceptada de ``length`` símbolos (por defecto, una longitud
+        sorteada según la distribución pedida)."""
+        rng = self.rng
+        if length is None:
+            length = rng.choices(self.lengths, self.weights)[0]
+        row = self.tabla.initial
+        out = []
+        for remaining in range(length, 0, -1):
+            group, row = rng.choice(self._choices(row, remaining))
+            out.append(group[0] if len(group) == 1 else rng.choice(group))
+        return ''.join(out)
+
+    def near_miss(self, attempts=20):
+        """Cadena rechazada a una mutación de distancia de una aceptada."""
+        rng = self.rng
+        symbols = self.tabla.symbols
+        base = self.accepted()
+        for _ in range(attempts):
+            s = list(base)
+            i = rng.randrange(len(s) + 1)
+            kind = rng.randrange(4) if s else 2
+            if kind == 0 and i < len(s):
+                s[i] = rng.choice(symbols)
+            elif kind == 1 and i < len(s):
+                del s[i]
+            elif kind == 3 and i + 1 < len(s):
+                s[i], s[i + 1] = s[i + 1], s[i]
+            else:
+                s.insert(i, rng.choice(symbols))
+            mutant = ''.join(s)
+            if mutant and not self.tabla.accepts(mutant):
+                return mutant
+        # Lenguajes muy permisivos: un símbolo fuera del alfabeto siempre
+        # rechaza.
+        return base + '#' if '#' not in self.tabla.alphabet else base + '\x7f'
+
+    def lines(self, n, rejected_ratio=0.0):
+        """Genera ``n`` cadenas, una fracción ``rejected_ratio`` de ellas
+        mutantes rechazados."""
+        rng = self.rng
+        for _ in range(n):
+            yield self.near_miss() if rng.random() < rejected_ratio else self.accepted()
+
+
+def write_corpus(out, generator, n, rejected_ratio=0.0):
+    """Escribe ``n`` líneas en ``out`` por bloques de ``BATCH_LINES``."""
+    lines = generator.lines(n, rejected_ratio)
+    while n > 0:
+        batch = min(n, BATCH_LINES)
+        out.write('\n'.join(next(lines) for _ in range(batch)) + '\n')
+        n -= batch
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Genera corpus de prueba desde los autómatas.")
+    parser.add_argument('automata', choices=VALIDATORS)
+    parser.add_argument('-n', '--cadenas', type=int, default=100000, help="líneas a generar")
+    parser.add_argument('-o', '--salida', default='-', help="archivo de salida ('-' para stdout)")
+    parser.add_argument('--longitud', type=parse_lengths, default='1-20',
+                        help="longitudes de las aceptadas: 'A-B', 'L' o 'L:peso,L:peso'")
+    parser.add_argument('--rechazadas', type=float, default=0.0,
+                        help="proporción de mutantes rechazados (0 a 1)")
+    parser.add_argument('--pesos', choices=['simbolo', 'clase'], default='simbolo',
+                        help="peso de cada transición en el paseo")
+    parser.add_argument('--semilla', type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    generator = CorpusGenerator(build_table(args.automata), args.longitud, args.pesos,
+                                args.semilla)
+    if args.salida == '-':
+        write_corpus(sys.stdout, generator, args.cadenas, args.rechazadas)
+    else:
+        with open(args.salida, 'w', encoding='utf-8', newline='\n') as out:
+            write_corpus(out, generator, args.cadenas, args.rechazadas)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""Instrumentación opcional de la validación con TablaDFA.
+
+``Metricas(tabla).classify`` se usa en lugar de ``TablaDFA.classify`` y
+además cuenta las transiciones tomadas por (estado, clase de símbolos), el
+estado en que muere cada cadena no aceptada y un histograma de latencias
+por cadena. Sin instrumentación no se paga nada: el motor no cambia, solo
+se elige otra función de validación.
+
+Las métricas se exportan como JSON (``to_json``) o en el formato de texto
+de Prometheus (``to_prometheus``).
+"""
+import json
+from time import perf_counter_ns
+from motor import ACCEPTED, REJECTED, ERROR, RESULT_LABELS, state_label, symbol_ranges
+
+# Cubetas del histograma: la cubeta k cuenta latencias menores a 2**k ns.
+N_BUCKETS = 48
+
+
+class Metricas:
+    """Contadores de validación de una TablaDFA; ``name`` se agrega como
+    etiqueta ``automata`` en Prometheus."""
+
+    def __init__(self, tabla, name=''):
+        self.tabla = tabla
+        self.name = name
+        self.transitions = [0] * len(tabla.table)
+        self.rejections = [0] * (len(tabla.table) // tabla.width)
+        self.results = [0, 0, 0]
+        self.latency = [0] * N_BUCKETS
+        self.latency_sum = 0
+
+    def classify(self, cadena):
+        """Igual que ``TablaDFA.classify``, registrando el recorrido.
+
+        El recorrido se corta al entrar en un estado sin salida; la cadena
+        se cuenta como rechazada en el último estado vivo que visitó.
+        """
+        started = perf_counter_ns()
+        tabla = self.tabla
+        table = tabla.table
+        index = tabla.symbol_index
+        invalid = tabla.invalid_class
+        dead_from = tabla.dead_from
+        counts = self.transitions
+
+        state = tabla.initial
+        last = state
+        if state < dead_from:
+            for ch in cadena:
+                i = state + index.get(ch, invalid)
+                counts[i] += 1
+                state = table[i]
+                if state >= dead_from:
+                    break
+                last = state
+
+        if state >= dead_from:
+            code = REJECTED if tabla.alphabet.issuperset(cadena) else ERROR
+        else:
+            code = ACCEPTED if state in tabla.final else REJECTED
+        if code != ACCEPTED:
+            self.rejections[last // tabla.width] += 1
+        self.results[code] += 1
+
+        elapsed = perf_counter_ns() - started
+        self.latency[min(elapsed.bit_length(), N_BUCKETS - 1)] += 1
+        self.latency_sum += elapsed
+        return code
+
+    def accepts(self, cadena):
+        return self.classify(cadena) == ACCEPTED
+
+    # --- lectura -------------------------------------------------------
+
+    def row_label(self, row):
+        tabla = self.tabla
+        if row * tabla.width == tabla.error_state:
+            return 'error'
+        return state_label(tabla.states[row]) or 'sumidero'
+
+    def class_label(self, c):
+        if c == self.tabla.invalid_class:
+            return 'inválido'
+        return ','.join(symbol_ranges(self.tabla.classes[c]))
+
+    def _visit_rows(self):
+        # Visitas por fila: las llegadas por una transición más los
+        # comienzos en el estado inicial.
+        width = self.tabla.width
+        visits = [0] * len(self.rejections)
+        visits[self.tabla.initial // width] = sum(self.results)
+        for i, n in enumerate(self.transitions):
+            if n:
+                visits[self.tabla.table[i] // width] += n
+        return visits
+
+    def state_visits(self):
+        return {self.row_label(row): n for row, n in enumerate(self._visit_rows()) if n}
+
+    def visits_by_state(self):
+        """Visitas con los nombres originales de los estados (frozensets en
+        un NFA determinizado), para colorear el grafo."""
+        return {self.tabla.states[row]: n for row, n in enumerate(self._visit_rows())
+                if n and self.tabla.states[row] is not None}
+
+    def transition_counts(self):
+        width = self.tabla.width
+        return [(self.row_label(i // width), self.class_label(i % width),
+                 self.row_label(self.tabla.table[i] // width), n)
+                for i, n in enumerate(self.transitions) if n]
+
+    def rejection_states(self):
+        return {self.row_label(row): n for row, n in enumerate(self.rejections) if n}
+
+    def latency_buckets(self):
+        """Pares ``(limite_ns, cuenta)`` hasta la última cubeta no vacía."""
+        last = max((k for k, n in enumerate(self.latency) if n), default=-1)
+        return [(2 ** k, self.latency[k]) for k in range(last + 1)]
+
+    # --- exportación ---------------------------------------------------
+
+    def to_dict(self):
+        return {
+            'automata': self.name,
+            'cadenas': sum(self.results),
+            'resultados': {RESULT_LABELS[code]: self.results[code]
+                           for code in (ACCEPTED, REJECTED, ERROR)},
+            'visitas': self.state_visits(),
+            'transiciones': [{'desde': source, 'clase': label, 'hacia': target, 'cuenta': n}
+                             for source, label, target, n in self.transition_counts()],
+            'rechazos_por_estado': self.rejection_states(),
+            'latencia_ns': {'cubetas': [{'menor_a': limit, 'cuenta': n}
+                                        for limit, n in self.latency_buckets()],
+                            'suma': self.latency_sum,
+                            'cuenta': sum(self.results)},
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self, prefix='automata'):
+        def labels(**values):
+            if self.name:
+                values = {'automata': self.name, **values}
+            return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in values.items()) + '}'
+
+        lines = [f"# HELP {prefix}_results_total Cadenas validadas por resultado.",
+                 f"# TYPE {prefix}_results_total counter"]
+        for code in (ACCEPTED, REJECTED, ERROR):
+            lines.append(f"{prefix}_results_total{labels(resultado=RESULT_LABELS[code])} "
+                         f"{self.results[code]}")
+
+        lines += [f"# HELP {prefix}_state_visits_total Visitas a cada estado.",
+                  f"# TYPE {prefix}_state_visits_total counter"]
+        for state, n in self.state_visits().items():
+            lines.append(f"{prefix}_state_visits_total{labels(estado=state)} {n}")
+
+        lines += [f"# HELP {prefix}_transitions_total Transiciones tomadas por estado y clase.",
+                  f"# TYPE {prefix}_transitions_total counter"]
+        for source, label, target, n in self.transition_counts():
+            lines.append(f"{prefix}_transitions_total"
+                         f"{labels(estado=source, clase=label, destino=target)} {n}")
+
+        lines += [f"# HELP {prefix}_rejections_total Cadenas no aceptadas por estado donde murieron.",
+                  f"# TYPE {prefix}_rejections_total counter"]
+        for state, n in self.rejection_states().items():
+            lines.append(f"{prefix}_rejections_total{labels(estado=state)} {n}")
+
+        lines += [f"# HELP {prefix}_latency_seconds Latencia de validación por cadena.",
+                  f"# TYPE {prefix}_latency_seconds histogram"]
+        total = 0
+        for limit, n in self.latency_buckets():
+            total += n
+            lines.append(f"{prefix}_latency_seconds_bucket{labels(le=repr(limit / 1e9))} {total}")
+        lines.append(f"{prefix}_latency_seconds_bucket{labels(le='+Inf')} {sum(self.results)}")
+        lines.append(f"{prefix}_latency_seconds_sum{labels()} {self.latency_sum / 1e9}")
+        lines.append(f"{prefix}_latency_seconds_count{labels()} {sum(self.results)}")
+        return '\n'.join(lines) + '\n'
+
+    def save(self, path):
+        """Guarda en ``path``: texto de Prometheus si termina en ``.prom``,
+        JSON en cualquier otro caso."""
+        text = self.to_prometheus() if path.endswith('.prom') else self.to_json()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,742 @@
+import contextlib
+import hashlib
+import json
+import mmap
+import os
+import struct
+from array import array
+from collections import namedtuple
+
+REJECTED, ACCEPTED, ERROR = 0, 1, 2
+RESULT_LABELS = ('RECHAZADA', 'ACEPTADA', 'ERROR')
+
+CACHE_DIR = os.environ.get('AUTOMATAS_CACHE',
+                           os.path.join(os.path.expanduser('~'), '.cache', 'automatas'))
+
+# Formato binario de TablaDFA: cabecera, mapa byte -> clase (256 bytes),
+# tabla int32, mapa de bits de aceptación y, al final, nombres de estados y
+# clases en JSON.
+TABLE_MAGIC = b'AFDT'
+TABLE_VERSION = 3
+TABLE_HEADER = struct.Struct('<4sHHIIIIII')
+FLAG_ASCII = 1
+
+# Cadenas por bloque de ``TablaDFA.accepts_batch``: acota la memoria
+# temporal sin importar el tamaño del lote.
+BATCH_STRINGS = 65536
+
+# Descripción mínima de un DFA, con los mismos atributos que usa TablaDFA de
+# ``automata.fa.dfa.DFA``; evita revalidar con automata-lib lo ya calculado.
+DFADefinition = namedtuple('DFADefinition',
+                           'states input_symbols transitions initial_state final_states')
+
+# Resultado de ``TablaDFA.run``: ``position`` es el índice del carácter que
+# hizo imposible la aceptación, o None si la cadena fue aceptada.
+Resultado = namedtuple('Resultado', 'accepted state position code')
+
+
+# Sumidero que agrega ``minimize`` cuando el DFA es parcial.
+_SINK = 'sumidero'
+
+
+def _state_key(state):
+    # Los estados de un DFA determinizado son frozensets, cuyo str() no
+    # tiene un orden estable entre ejecuciones.
+    if isinstance(state, frozenset):
+        return (1, sorted(map(str, state)))
+    return (0, [str(state)])
+
+
+class TablaDFA:
+    """DFA compilado a una tabla densa de enteros (estado x clase de símbolos).
+
+    Los símbolos con la misma columna de transiciones en todos los estados
+    forman una clase de equivalencia (por ejemplo [A-Z], [1-9] y '0' en el
+    autómata POS), y la tabla guarda una columna por clase más una última
+    columna, la de los símbolos inválidos, que lleva a un estado de error.
+
+    Los estados se guardan como desplazamientos de fila (``i * width``), de
+    modo que cada paso de la validación es una sola suma y un índice:
+    ``state = table[state + symbol_index[ch]]``. ``byte_classes`` es el mapa
+    de 256 entradas byte -> clase para entradas ASCII.
+
+    Las filas de los estados sin salida (desde los que no se alcanza ningún
+    estado final, como ``q14`` en CorreoUPTC) van al final de la tabla, así
+    que ``state >= dead_from`` basta para saber que la cadena ya no se
+    puede aceptar.
+    """
+
+    def __init__(self, dfa):
+        states = sorted(dfa.states, key=_state_key)
+        predecessors = {state: set() for state in states}
+        for state in states:
+            for target in dfa.transitions.get(state, {}).values():
+                predecessors[target].add(state)
+        alive = set(dfa.final_states)
+        pending = list(alive)
+        while pending:
+            for state in predecessors[pending.pop()]:
+                if state not in alive:
+                    alive.add(state)
+                    pending.append(state)
+        states = [state for state in states if state in alive] + \
+                 [state for state in states if state not in alive]
+
+        state_index = {state: i for i, state in enumerate(states)}
+        self.symbols = sorted(dfa.input_symbols, key=str)
+
+        columns = {}
+        for symbol in self.symbols:
+            column = tuple(dfa.transitions.get(state, {}).get(symbol) for state in states)
+            columns.setdefault(column, []).append(symbol)
+        self.classes = list(columns.values())
+        self.symbol_index = {symbol: c for c, group in enumerate(self.classes) for symbol in group}
+        self.n_classes = len(self.classes)
+        self.invalid_class = self.n_classes
+        self.width = width = self.n_classes + 1
+
+        # Filas extra (sin nombre): un sumidero para las transiciones que
+        # falten en un DFA parcial y el estado de error de los inválidos.
+        partial = any(None in column for column in columns)
+        self.states = states + [None] * (2 if partial else 1)
+        self.state_index = state_index
+        sink = len(states) * width
+        self.error_state = (len(self.states) - 1) * width
+
+        table = []
+        for i in range(len(states)):
+            for column in columns:
+                target = column[i]
+                table.append(sink if target is None else state_index[target] * width)
+            table.append(self.error_state)
+        if partial:
+            table.extend([sink] * self.n_classes + [self.error_state])
+        table.extend([self.error_state] * width)
+
+        self.table = table
+        self.dead_from = len(alive) * width
+        self.alphabet = frozenset(self.symbols)
+        self.initial = state_index[dfa.initial_state] * width
+        self.final = frozenset(state_index[state] * width for state in dfa.final_states)
+
+        self.ascii = width < 256 and all(
+            isinstance(symbol, str) and len(symbol) == 1 and ord(symbol) < 128
+            for symbol in self.symbols)
+        byte_classes = bytearray([self.invalid_class % 256]) * 256
+        if self.ascii:
+            for symbol, c in self.symbol_index.items():
+                byte_classes[ord(symbol)] = c
+        self.byte_classes = bytes(byte_classes) if self.ascii else None
+        self._batch = None
+
+    @classmethod
+    def from_nfa(cls, nfa, cache_dir=CACHE_DIR):
+        """Compila un NFA de automata-lib a tabla; ver ``determinize_cached``."""
+        return cls(determinize_cached(nfa, cache_dir))
+
+    def save(self, path):
+        """Guarda la tabla en el formato binario de ``load``."""
+        n_rows = len(self.table) // self.width
+        accept = bytearray((n_rows + 7) // 8)
+        for offset in self.final:
+            row = offset // self.width
+            accept[row // 8] |= 1 << (row % 8)
+        names = json.dumps({
+            'states': [_encode_state(state) for state in self.states],
+            'classes': self.classes,
+        }, ensure_ascii=False).encode('utf-8')
+
+        import numpy as np
+
+        with atomic_write(path) as f:
+            f.write(TABLE_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, FLAG_ASCII if self.ascii else 0,
+                                      n_rows, self.width, self.initial, self.error_state,
+                                      self.dead_from, len(names)))
+            f.write(self.byte_classes or bytes(256))
+            f.write(np.array(self.table, dtype='<i4').tobytes())
+            f.write(accept)
+            f.write(names)
+
+    @classmethod
+    def load(cls, path, use_mmap=True):
+        """Carga una tabla guardada con ``save``.
+
+        Con ``use_mmap`` el archivo se proyecta en memoria y la validación
+        lee la tabla directamente del búfer, sin copiarla: el arranque no
+        depende del tamaño del autómata y los procesos que cargan el mismo
+        archivo comparten las páginas. Sin ``use_mmap`` la tabla se copia a
+        una lista, que se recorre más rápido que el búfer.
+        """
+        with open(path, 'rb') as f:
+            if use_mmap:
+                buffer = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            else:
+                buffer = memoryview(f.read())
+
+        magic, version, flags, n_rows, width, initial, error_state, dead_from, names_size = \
+            TABLE_HEADER.unpack_from(buffer)
+        if magic != TABLE_MAGIC or version != TABLE_VERSION:
+            raise ValueError(f"{path}: no es una tabla de autómata (versión {TABLE_VERSION})")
+
+        start = TABLE_HEADER.size
+        byte_classes = buffer[start:start + 256]
+        start += 256
+        table = buffer[start:start + 4 * n_rows * width].cast('i')
+        start += 4 * n_rows * width
+        accept = buffer[start:start + (n_rows + 7) // 8]
+        start += len(accept)
+        names = json.loads(bytes(buffer[start:start + names_size]).decode('utf-8'))
+
+        self = cls.__new__(cls)
+        self.states = [_decode_state(state) for state in names['states']]
+        self.state_index = {state: i for i, state in enumerate(self.states) if state is not None}
+        self.classes = names['classes']
+        self.symbols = sorted(symbol for group in self.classes for symbol in group)
+        self.alphabet = frozenset(self.symbols)
+        self.symbol_index = {symbol: c for c, group in enumerate(self.classes) for symbol in group}
+        self.n_classes = len(self.classes)
+        self.invalid_class = self.n_classes
+        self.width = width
+        self.error_state = error_state
+        self.dead_from = dead_from
+        self.table = table if use_mmap else table.tolist()
+        self.initial = initial
+        self.final = frozenset(row * width for row in range(n_rows)
+                               if accept[row // 8] >> (row % 8) & 1)
+        self.ascii = bool(flags & FLAG_ASCII)
+        self.byte_classes = byte_classes if self.ascii else None
+        self._batch = None
+        return self
+
+    def state_name(self, offset):
+        return self.states[offset // self.width]
+
+    def accepts(self, cadena):
+        """Devuelve True si el DFA acepta la cadena; los símbolos fuera del
+        alfabeto la rechazan, igual que ``DFA.accepts_input``."""
+        table = self.table
+        index = self.symbol_index
+        state = self.initial
+        try:
+            for ch in cadena:
+                state = table[state + index[ch]]
+        except KeyError:
+            return False
+        return state in self.final
+
+    def classify(self, cadena):
+        """Como ``accepts`` pero distingue los símbolos fuera del alfabeto:
+        devuelve ``ACCEPTED``, ``REJECTED`` o ``ERROR``."""
+        table = self.table
+        index = self.symbol_index
+        state = self.initial
+        try:
+            for ch in cadena:
+                state = table[state + index[ch]]
+        except KeyError:
+            return ERROR
+        return ACCEPTED if state in self.final else REJECTED
+
+    def _byte_columns(self, data):
+        # Un solo ``translate`` en C convierte cada byte en su columna; los
+        # bytes fuera del alfabeto caen en la columna inválida.
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return data.translate(self.byte_classes)
+
+    def accepts_bytes(self, data):
+        """Como ``accepts`` pero sobre ``bytes``, ``bytearray`` o
+        ``memoryview`` (p. ej. una línea de un búfer o de un mmap), sin
+        decodificar. Solo las tablas con alfabeto ASCII usan la tabla de 256
+        entradas; las demás decodifican como UTF-8."""
+        if self.byte_classes is None:
+            return self.accepts(bytes(data).decode('utf-8', errors='replace'))
+        table = self.table
+        state = self.initial
+        for c in self._byte_columns(data):
+            state = table[state + c]
+        return state in self.final
+
+    def classify_bytes(self, data):
+        """Como ``classify`` pero sobre bytes; un byte inválido lleva al
+        estado de error, que solo se alcanza así."""
+        if self.byte_classes is None:
+            return self.classify(bytes(data).decode('utf-8', errors='replace'))
+        table = self.table
+        state = self.initial
+        for c in self._byte_columns(data):
+            state = table[state + c]
+        if state == self.error_state:
+            return ERROR
+        return ACCEPTED if state in self.final else REJECTED
+
+    def run(self, cadena):
+        """Valida en una sola pasada y devuelve un ``Resultado``.
+
+        La pasada se detiene en cuanto entra en un estado sin salida o lee un
+        símbolo inválido, y ``position`` indica ese carácter; si la cadena se
+        consume entera sin aceptar, ``position`` es ``len(cadena)``.
+        ``code`` coincide con el de ``classify``.
+        """
+        table = self.table
+        index = self.symbol_index
+        dead_from = self.dead_from
+        state = self.initial
+        if state >= dead_from:
+            code = REJECTED if self.alphabet.issuperset(cadena) else ERROR
+            return Resultado(False, self.state_name(state), 0, code)
+
+        for position, ch in enumerate(cadena):
+            c = index.get(ch)
+            if c is None:
+                return Resultado(False, None, position, ERROR)
+            state = table[state + c]
+            if state >= dead_from:
+                code = REJECTED if self.alphabet.issuperset(cadena) else ERROR
+                return Resultado(False, self.state_name(state), position, code)
+
+        if state in self.final:
+            return Resultado(True, self.state_name(state), None, ACCEPTED)
+        return Resultado(False, self.state_name(state), len(cadena), REJECTED)
+
+    def trace(self, cadena):
+        """Recorrido paso a paso de ``cadena`` como una ``Traza`` compacta."""
+        return Traza(self, cadena)
+
+    def _batch_tables(self):
+        """Tablas para ``accepts_batch``, construidas la primera vez.
+
+        Devuelve ``(lut, grid, accept)``: ``lut`` es ``byte_classes`` como
+        arreglo y ``grid`` la tabla en índices de estado (no desplazamientos).
+        """
+        import numpy as np
+
+        if self._batch is None:
+            width = self.width
+            n_rows = len(self.table) // width
+            grid = np.asarray(self.table, dtype=np.int32).reshape(n_rows, width) // width
+            lut = np.frombuffer(self.byte_classes, dtype=np.uint8)
+            accept = np.zeros(n_rows, dtype=bool)
+            accept[[offset // width for offset in self.final]] = True
+            self._batch = (lut, grid, accept)
+        return self._batch
+
+    def accepts_batch(self, strings):
+        """Valida muchas cadenas a la vez y devuelve un arreglo ``bool``.
+
+        Se procesan por bloques de ``BATCH_STRINGS`` cadenas; en cada bloque
+        todas las cadenas avanzan juntas, un carácter por paso, con
+        indexación avanzada sobre la tabla de transiciones.
+        """
+        import numpy as np
+
+        strings = strings if isinstance(strings, list) else list(strings)
+        if not self.ascii:
+            return np.fromiter(map(self.accepts, strings), dtype=bool, count=len(strings))
+
+        accepted = np.empty(len(strings), dtype=bool)
+        for start in range(0, len(strings), BATCH_STRINGS):
+            block = strings[start:start + BATCH_STRINGS]
+            accepted[start:start + len(block)] = self._accepts_block(block)
+        return accepted
+
+    def _accepts_block(self, strings):
+        import numpy as np
+
+        lut, grid, accept = self._batch_tables()
+        # Con un alfabeto ASCII cualquier carácter no ASCII es inválido, así
+        # que basta con UTF-8: sus bytes (>= 128) caen en la clase inválida.
+        encoded = [s.encode('utf-8') for s in strings]
+        lengths = np.fromiter(map(len, encoded), dtype=np.intp, count=len(encoded))
+        states = np.full(len(encoded), self.initial // self.width, dtype=np.int32)
+        longest = int(lengths.max()) if len(encoded) else 0
+        if not longest:
+            return accept[states]
+        data = lut[np.frombuffer(b''.join(encoded), dtype=np.uint8)]
+        dead_row = self.dead_from // self.width
+
+        if lengths.min() == longest:
+            # Todas de la misma longitud (códigos POS): la concatenación ya
+            # es la matriz cadenas x caracteres.
+            matrix = data.reshape(len(encoded), longest)
+            for j in range(longest):
+                states = grid[states, matrix[:, j]]
+                if j % 8 == 7 and states.min() >= dead_row:
+                    break
+            return accept[states]
+
+        # Ordenadas de la más larga a la más corta, en el paso j siguen solo
+        # las ``active[j]`` primeras (las de más de j caracteres), que leen
+        # su carácter directamente de la concatenación: no hay relleno.
+        order = np.argsort(-lengths, kind='stable')
+        starts = (np.cumsum(lengths) - lengths)[order]
+        active = np.searchsorted(-lengths[order], -np.arange(longest), side='left')
+        for j in range(longest):
+            n = active[j]
+            current = grid[states[:n], data[starts[:n] + j]]
+            states[:n] = current
+            # Si las que siguen ya cayeron en estados sin salida, no hace
+            # falta leer el resto.
+            if j % 8 == 7 and current.min() >= dead_row:
+                break
+        accepted = np.empty(len(encoded), dtype=bool)
+        accepted[order] = accept[states]
+        return accepted
+
+    def classify_batch(self, strings):
+        """Como ``accepts_batch`` pero devuelve los códigos de ``classify``
+        en un arreglo ``uint8``; solo las cadenas no aceptadas se revisan
+        en busca de símbolos inválidos."""
+        import numpy as np
+
+        strings = list(strings)
+        accepted = self.accepts_batch(strings)
+        codes = np.where(accepted, ACCEPTED, REJECTED).astype(np.uint8)
+        alphabet = self.alphabet
+        for i in np.flatnonzero(~accepted):
+            if not alphabet.issuperset(strings[i]):
+                codes[i] = ERROR
+        return codes
+
+
+class Traza:
+    """Traza de una validación guardada por tramos.
+
+    Cada tramo es un paso ``origen --símbolo--> destino``; los lazos
+    repetidos con el mismo símbolo se acumulan en un solo tramo (``F0
+    --0×5000--> F0``). Los tramos se guardan en arreglos de enteros y el
+    texto de cada línea se arma solo cuando se pide con ``line``, así que
+    una cadena de 100 000 símbolos no crea 100 000 strings.
+
+    La línea 0 es el estado inicial y la última el resultado.
+    """
+
+    def __init__(self, tabla, cadena):
+        self.tabla = tabla
+        self.cadena = cadena
+        self.sources = array('q')
+        self.positions = array('q')
+        self.counts = array('q')
+        self.error_position = None
+
+        table = tabla.table
+        index = tabla.symbol_index
+        state = tabla.initial
+        sources, positions, counts = self.sources, self.positions, self.counts
+        loop = False
+        for position, ch in enumerate(cadena):
+            c = index.get(ch)
+            if c is None:
+                self.error_position = position
+                break
+            target = table[state + c]
+            if loop and target == state and cadena[positions[-1]] == ch:
+                counts[-1] += 1
+            else:
+                sources.append(state)
+                positions.append(position)
+                counts.append(1)
+                loop = target == state
+            state = target
+        self.state = state
+
+        if self.error_position is not None:
+            self.code = ERROR
+        else:
+            self.code = ACCEPTED if state in tabla.final else REJECTED
+
+    def _name(self, offset):
+        return state_label(self.tabla.state_name(offset)) or _SINK
+
+    def _target(self, i):
+        if i + 1 < len(self.sources):
+            return self.sources[i + 1]
+        return self.state
+
+    def __len__(self):
+        return len(self.sources) + 2
+
+    def line(self, i):
+        if i == 0:
+            return f"Estado inicial: {self._name(self.tabla.initial)}"
+        if i == len(self.sources) + 1:
+            if self.code == ERROR:
+                return (f"Símbolo inválido {self.cadena[self.error_position]!r} "
+                        f"en la posición {self.error_position + 1} - ERROR")
+            return f"Estado final: {self._name(self.state)} - {RESULT_LABELS[self.code]}"
+        i -= 1
+        count = self.counts[i]
+        symbol = self.cadena[self.positions[i]]
+        if count > 1:
+            symbol = f"{symbol}×{count}"
+        return f"{self._name(self.sources[i])} --{symbol}--> {self._name(self._target(i))}"
+
+    def lines(self, start=0, stop=None):
+        stop = len(self) if stop is None else min(stop, len(self))
+        return [self.line(i) for i in range(start, stop)]
+
+    def export(self, path):
+        """Escribe la traza completa en un archivo de texto, línea a línea."""
+        with open(path, 'w', encoding='utf-8') as f:
+            for i in range(len(self)):
+                f.write(self.line(i) + '\n')
+
+
+
+def _encode_state(state):
+    # JSON no distingue tuplas de conjuntos: los frozenset (estados de un
+    # NFA determinizado) se guardan como {"set": [...]} y las tuplas (los
+    # ``(campo, estado)`` de registros.py) como listas.
+    if isinstance(state, frozenset):
+        return {'set': sorted((_encode_state(s) for s in state), key=json.dumps)}
+    if isinstance(state, tuple):
+        return [_encode_state(s) for s in state]
+    return state
+
+
+def _decode_state(data):
+    if isinstance(data, dict):
+        return frozenset(_decode_state(s) for s in data['set'])
+    if isinstance(data, list):
+        return tuple(_decode_state(s) for s in data)
+    return data
+
+
+def state_label(state):
+    """Nombre legible de un estado: los subconjuntos de un NFA
+    determinizado se muestran como ``{P2,P4}``."""
+    if state is None:
+        return ''
+    if isinstance(state, frozenset):
+        return '{' + ','.join(sorted(map(str, state))) + '}'
+    return str(state)
+
+
+def symbol_ranges(symbols):
+    """Resume un conjunto de símbolos de un carácter en rangos contiguos,
+    p. ej. ``{'0', ..., '9'} -> ['0-9']``; sirve para etiquetar aristas."""
+    codes = sorted({ord(symbol) for symbol in symbols})
+    ranges = []
+    start = prev = None
+    for code in codes + [None]:
+        if code is not None and prev is not None and code == prev + 1:
+            prev = code
+            continue
+        if start is not None:
+            if prev - start >= 2:
+                ranges.append(f"{chr(start)}-{chr(prev)}")
+            else:
+                ranges.extend(chr(c) for c in range(start, prev + 1))
+        start = prev = code
+    return ranges
+
+
+def _nfa_definition(nfa):
+    """Forma canónica (serializable en JSON) de un NFA de automata-lib."""
+    return {
+        'states': sorted(map(str, nfa.states)),
+        'input_symbols': sorted(map(str, nfa.input_symbols)),
+        'transitions': {str(state): {str(symbol): sorted(map(str, targets))
+                                     for symbol, targets in moves.items()}
+                        for state, moves in nfa.transitions.items()},
+        'initial_state': str(nfa.initial_state),
+        'final_states': sorted(map(str, nfa.final_states)),
+    }
+
+
+def determinize(nfa):
+    """Construcción de subconjuntos sobre un NFA de automata-lib (con
+    transiciones épsilon bajo el símbolo ``''``).
+
+    Solo genera los subconjuntos alcanzables; cada estado del DFA es el
+    frozenset de estados del NFA que representa, y el conjunto vacío hace
+    de sumidero.
+    """
+    transitions = nfa.transitions
+
+    def closure(states):
+        stack = list(states)
+        closed = set(states)
+        while stack:
+            for target in transitions.get(stack.pop(), {}).get('', ()):
+                if target not in closed:
+                    closed.add(target)
+                    stack.append(target)
+        return frozenset(closed)
+
+    symbols = sorted(nfa.input_symbols, key=str)
+    initial = closure({nfa.initial_state})
+    dfa_transitions = {}
+    pending = [initial]
+    while pending:
+        current = pending.pop()
+        if current in dfa_transitions:
+            continue
+        moves = {}
+        for symbol in symbols:
+            targets = set()
+            for state in current:
+                targets.update(transitions.get(state, {}).get(symbol, ()))
+            target = closure(targets)
+            moves[symbol] = target
+            if target not in dfa_transitions:
+                pending.append(target)
+        dfa_transitions[current] = moves
+
+    return DFADefinition(
+        states=set(dfa_transitions),
+        input_symbols=set(symbols),
+        transitions=dfa_transitions,
+        initial_state=initial,
+        final_states={state for state in dfa_transitions if state & nfa.final_states},
+    )
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode='wb', **kwargs):
+    """Abre un temporal junto a ``path`` y lo renombra a ``path`` al salir
+    sin errores: otro proceso nunca lee el archivo a medio escribir."""
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+        raise
+
+
+def cached_json(path, build, encode, decode):
+    """Devuelve ``decode`` del JSON guardado en ``path`` o, si falta o no se
+    puede leer, ``build()``, que se guarda con ``encode``. Con ``path``
+    ``None`` no se usa el disco; los errores de escritura se ignoran."""
+    if path and os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return decode(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    value = build()
+    if path:
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with atomic_write(path, 'w', encoding='utf-8') as f:
+                json.dump(encode(value), f)
+        except OSError:
+            pass
+    return value
+
+
+def determinize_cached(nfa, cache_dir=CACHE_DIR):
+    """``determinize`` con caché en disco: el DFA resultante se guarda en
+    ``cache_dir`` con el hash de la definición del NFA y se reutiliza en las
+    siguientes ejecuciones mientras el NFA no cambie."""
+    definition = _nfa_definition(nfa)
+    key = hashlib.sha256(json.dumps(definition, sort_keys=True).encode('utf-8')).hexdigest()
+    path = os.path.join(cache_dir, f'nfa-{key[:32]}.json') if cache_dir else None
+    return cached_json(path, lambda: determinize(nfa), _dfa_to_json, _dfa_from_json)
+
+
+def minimize(dfa):
+    """Minimización de Hopcroft.
+
+    Descarta los estados inalcanzables, completa las transiciones que falten
+    con un sumidero y fusiona los estados equivalentes. Cada bloque toma el
+    nombre de su estado menor, así que ``q2`` y ``q3`` de L1 quedan como
+    ``q2``.
+    """
+    symbols = sorted(dfa.input_symbols, key=str)
+
+    reachable = {dfa.initial_state}
+    pending = [dfa.initial_state]
+    while pending:
+        for target in dfa.transitions.get(pending.pop(), {}).values():
+            if target not in reachable:
+                reachable.add(target)
+                pending.append(target)
+
+    sink = _SINK
+    while sink in reachable:
+        sink += "'"
+    delta = {}
+    for state in reachable:
+        moves = dfa.transitions.get(state, {})
+        delta[state] = {symbol: moves.get(symbol, sink) for symbol in symbols}
+    if any(sink in moves.values() for moves in delta.values()):
+        delta[sink] = {symbol: sink for symbol in symbols}
+
+    inverse = {symbol: {} for symbol in symbols}
+    for state, moves in delta.items():
+        for symbol, target in moves.items():
+            inverse[symbol].setdefault(target, set()).add(state)
+
+    finals = {state for state in delta if state in dfa.final_states}
+    others = set(delta) - finals
+    partition = [block for block in (finals, others) if block]
+    work = [min(partition, key=len)] if len(partition) == 2 else []
+
+    while work:
+        splitter = work.pop()
+        for symbol in symbols:
+            predecessors = set()
+            for target in splitter:
+                predecessors.update(inverse[symbol].get(target, ()))
+            if not predecessors:
+                continue
+            refined = []
+            for block in partition:
+                inside = block & predecessors
+                if inside and len(inside) < len(block):
+                    outside = block - inside
+                    refined.extend((inside, outside))
+                    if block in work:
+                        work.remove(block)
+                        work.extend((inside, outside))
+                    else:
+                        work.append(min(inside, outside, key=len))
+                else:
+                    refined.append(block)
+            partition = refined
+
+    names = {}
+    for block in partition:
+        named = [state for state in block if state != sink]
+        name = min(named, key=_state_key) if named else sink
+        for state in block:
+            names[state] = name
+
+    return DFADefinition(
+        states=set(names.values()),
+        input_symbols=set(symbols),
+        transitions={names[state]: {symbol: names[target] for symbol, target in moves.items()}
+                     for state, moves in delta.items()},
+        initial_state=names[dfa.initial_state],
+        final_states={names[state] for state in finals},
+    )
+
+
+def _dfa_to_json(dfa):
+    states = sorted(dfa.states, key=_state_key)
+    index = {state: i for i, state in enumerate(states)}
+    return {
+        'states': [sorted(state) for state in states],
+        'input_symbols': sorted(dfa.input_symbols),
+        'transitions': [{symbol: index[target] for symbol, target in dfa.transitions[state].items()}
+                        for state in states],
+        'initial_state': index[dfa.initial_state],
+        'final_states': sorted(index[state] for state in dfa.final_states),
+    }
+
+
+def _dfa_from_json(data):
+    states = [frozenset(state) for state in data['states']]
+    return DFADefinition(
+        states=set(states),
+        input_symbols=set(data['input_symbols']),
+        transitions={state: {symbol: states[target] for symbol, target in moves.items()}
+                     for state, moves in zip(states, data['transitions'])},
+        initial_state=states[data['initial_state']],
+        final_states={states[i] for i in data['final_states']},
+    )
@@ -0,0 +1,145 @@
+"""Validación de registros con varios campos en una sola pasada.
+
+Un registro como ``correo,codigo_pos,contrasena`` se valida con un único DFA
+que concatena los autómatas de cada campo: desde un estado final del campo
+``i`` el separador lleva al estado inicial del campo ``i + 1``. Los estados
+se nombran ``(i, estado)`` y cada campo tiene su propio sumidero, así que el
+estado donde se detiene la pasada indica qué campo falló.
+
+    python registros.py correos,pos,contrasenas registros.csv
+    python registros.py pos,binario -s ';' datos.txt -f csv -o resultados.csv
+
+El separador no puede pertenecer al alfabeto de ningún campo; los campos
+no admiten comillas al estilo CSV.
+"""
+import argparse
+import csv
+import json
+import sys
+from collections import namedtuple
+from motor import TablaDFA, DFADefinition, ACCEPTED, REJECTED, ERROR, RESULT_LABELS
+from validar_lote import VALIDATORS, load_dfa, open_input, open_output
+
+# ``field`` es el nombre del campo que falló (None si se aceptó) y
+# ``position`` el índice en el registro del carácter donde falló.
+ResultadoRegistro = namedtuple('ResultadoRegistro', 'accepted field position code')
+
+
+def concatenate(dfas, separator=','):
+    """DFA de ``d1 SEP d2 SEP ... dn`` para una lista de DFA (de automata-lib
+    o ``DFADefinition``)."""
+    alphabets = [set(dfa.input_symbols) for dfa in dfas]
+    for i, alphabet in enumerate(alphabets):
+        if separator in alphabet:
+            raise ValueError(f"el separador {separator!r} pertenece al alfabeto del campo {i + 1}")
+    symbols = set().union(*alphabets) | {separator}
+
+    states = set()
+    transitions = {}
+    for i, dfa in enumerate(dfas):
+        sink = (i, None)
+        last = i == len(dfas) - 1
+        states.add(sink)
+        transitions[sink] = {symbol: sink for symbol in symbols}
+        for state in dfa.states:
+            row = {symbol: sink for symbol in symbols}
+            for symbol, target in dfa.transitions.get(state, {}).items():
+                row[symbol] = (i, target)
+            if state in dfa.final_states and not last:
+                row[separator] = (i + 1, dfas[i + 1].initial_state)
+            states.add((i, state))
+            transitions[(i, state)] = row
+
+    finals = {(len(dfas) - 1, state) for state in dfas[-1].final_states}
+    return DFADefinition(states, symbols, transitions, (0, dfas[0].initial_state), finals)
+
+
+class RecordValidator:
+    """Valida registros ``campo SEP campo ...`` con la TablaDFA del DFA
+    concatenado; ``fields`` son nombres de ``validar_lote.VALIDATORS``."""
+
+    def __init__(self, fields, separator=','):
+        self.fields = list(fields)
+        self.separator = separator
+        self.dfas = [load_dfa(name) for name in self.fields]
+        self.tabla = TablaDFA(concatenate(self.dfas, separator))
+
+    def accepts(self, record):
+        return self.tabla.accepts(record)
+
+    def accepts_batch(self, records):
+        return self.tabla.accepts_batch(records)
+
+    def validate(self, record):
+        """Una pasada con ``TablaDFA.run``; devuelve un ``ResultadoRegistro``."""
+        result = self.tabla.run(record)
+        if result.accepted:
+            return ResultadoRegistro(True, None, None, ACCEPTED)
+
+        if result.state is None:
+            # Símbolo inválido: el campo se deduce de los separadores previos.
+            index = record.count(self.separator, 0, result.position)
+        else:
+            index, state = result.state
+            # El registro terminó en un estado final de un campo intermedio:
+            # falta el campo siguiente.
+            if (result.position == len(record) and index < len(self.fields) - 1
+                    and state in self.dfas[index].final_states):
+                index += 1
+        index = min(index, len(self.fields) - 1)
+        return ResultadoRegistro(False, self.fields[index], result.position, result.code)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Valida registros de varios campos en una pasada.")
+    parser.add_argument('campos', type=lambda spec: spec.split(','),
+                        help=f"autómatas de cada campo separados por comas ({', '.join(VALIDATORS)})")
+    parser.add_argument('entrada', nargs='?', default='-',
+                        help="archivo de entrada, un registro por línea ('-' para stdin)")
+    parser.add_argument('-s', '--separador', default=',', help="separador de campos")
+    parser.add_argument('-o', '--salida', default='-', help="archivo de salida ('-' para stdout)")
+    parser.add_argument('-f', '--formato', choices=['jsonl', 'csv'], default='jsonl')
+    args = parser.parse_intermixed_args(argv)
+    unknown = [name for name in args.campos if name not in VALIDATORS]
+    if unknown:
+        parser.error(f"autómatas desconocidos: {', '.join(unknown)}")
+    if len(args.separador) != 1:
+        parser.error("el separador debe ser un solo carácter")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        validator = RecordValidator(args.campos, args.separador)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    counts = [0, 0, 0]
+    with open_input(args.entrada) as f, open_output(args.salida) as out:
+        writer = csv.writer(out, lineterminator='\n') if args.formato == 'csv' else None
+        if writer:
+            writer.writerow(['linea', 'registro', 'resultado', 'campo', 'posicion'])
+        for number, line in enumerate(f, start=1):
+            record = line.rstrip('\r\n')
+            if not record:
+                continue
+            result = validator.validate(record)
+            counts[result.code] += 1
+            if writer:
+                writer.writerow([number, record, RESULT_LABELS[result.code], result.field or '',
+                                 '' if result.position is None else result.position])
+            else:
+                out.write(json.dumps({'linea': number, 'registro': record,
+                                      'resultado': RESULT_LABELS[result.code],
+                                      'campo': result.field, 'posicion': result.position},
+                                     ensure_ascii=False) + '\n')
+
+    print(", ".join(f"{RESULT_LABELS[code]}: {counts[code]}" for code in (ACCEPTED, REJECTED, ERROR)),
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
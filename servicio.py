@@ -0,0 +1,369 @@
+"""Servicio local de validación: todos los autómatas en un solo proceso.
+
+Servidor HTTP/1.1 mínimo sobre asyncio (TCP o socket Unix, con conexiones
+persistentes) y sin dependencias externas. Las peticiones individuales que
+llegan a la vez se juntan en micro-lotes que se validan con
+``TablaDFA.classify_batch``; las peticiones en lote van directo al motor por
+lotes. En ambos casos cada cadena repetida dentro de un lote se valida una
+sola vez.
+
+    python servicio.py servir --puerto 8080
+    python servicio.py servir --unix /tmp/automatas.sock
+    python servicio.py carga --puerto 8080 --automata correos -n 20000 -c 64
+
+Rutas:
+
+    POST /validar/<automata>   {"cadena": "..."}  ->  {"resultado": "ACEPTADA"}
+                               {"cadenas": [...]} ->  {"resultados": [...]}
+    GET  /metricas             percentiles de latencia y tamaño de los micro-lotes
+    GET  /salud
+
+Los cuerpos de más de ``MAX_BODY`` bytes, los lotes de más de
+``MAX_ITEMS`` cadenas y las cadenas de más de ``MAX_LENGTH`` caracteres se
+rechazan con 413.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+import numpy as np
+from cache import classify_dedup
+from motor import RESULT_LABELS
+from validar_lote import VALIDATORS, build_table
+
+MAX_BATCH = 512
+MAX_DELAY_MS = 0.5
+LATENCY_WINDOW = 20000
+# Límites por petición: tamaño del cuerpo, cadenas de un lote y caracteres
+# por cadena. Los lotes de más de ``INLINE_ITEMS`` cadenas se validan en un
+# hilo aparte para no detener el bucle de eventos.
+MAX_BODY = 8 * 1024 * 1024
+MAX_ITEMS = 100_000
+MAX_LENGTH = 64 * 1024
+INLINE_ITEMS = 2048
+PERCENTILES = (50, 90, 99, 99.9)
+
+STATUS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+          413: 'Payload Too Large'}
+
+
+def percentiles(samples_ns):
+    """Percentiles en milisegundos de una colección de latencias en ns."""
+    if not samples_ns:
+        return {}
+    values = np.percentile(np.fromiter(samples_ns, dtype=np.float64), PERCENTILES) / 1e6
+    return {f"p{p:g}": round(float(v), 4) for p, v in zip(PERCENTILES, values)}
+
+
+class MicroBatcher:
+    """Junta las validaciones individuales concurrentes de un autómata.
+
+    La primera cadena que llega abre un lote; se cede el control una vez
+    para que entren las que ya están listas y, si el lote no se llenó, se
+    espera hasta ``max_delay`` segundos antes de validarlo entero.
+    """
+
+    def __init__(self, tabla, max_batch=MAX_BATCH, max_delay=MAX_DELAY_MS / 1000):
+        self.tabla = tabla
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue = asyncio.Queue()
+        self.batch_sizes = deque(maxlen=LATENCY_WINDOW)
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def classify(self, cadena):
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((cadena, future))
+        return await future
+
+    def _drain(self, batch):
+        while len(batch) < self.max_batch and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+
+    async def _run(self):
+        while True:
+            batch = [await self.queue.get()]
+            await asyncio.sleep(0)
+            self._drain(batch)
+            if len(batch) < self.max_batch and self.max_delay > 0:
+                await asyncio.sleep(self.max_delay)
+                self._drain(batch)
+
+            try:
+                codes = classify_dedup(self.tabla.classify_batch, [cadena for cadena, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), code in zip(batch, codes):
+                    if not future.done():
+                        future.set_result(int(code))
+            self.batch_sizes.append(len(batch))
+
+
+class Servicio:
+    """Tablas de los autómatas ``names`` y el manejador HTTP que las sirve."""
+
+    def __init__(self, names=VALIDATORS, max_batch=MAX_BATCH, max_delay_ms=MAX_DELAY_MS):
+        self.tablas = {name: build_table(name) for name in names}
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self.batchers = {}
+        self.latencies = {'individual': deque(maxlen=LATENCY_WINDOW),
+                          'lote': deque(maxlen=LATENCY_WINDOW)}
+        self.counts = {'individual': 0, 'lote': 0, 'cadenas': 0}
+
+    def _batcher(self, name):
+        if name not in self.batchers:
+            self.batchers[name] = MicroBatcher(self.tablas[name], self.max_batch, self.max_delay)
+        return self.batchers[name]
+
+    async def route(self, method, path, body):
+        """Devuelve ``(status, payload, tipo)``; ``tipo`` es la serie de
+        latencias donde se registra la petición, o None."""
+        if path == '/salud':
+            return 200, {'estado': 'ok', 'automatas': sorted(self.tablas)}, None
+        if path == '/metricas':
+            return 200, self.metrics(), None
+        if not path.startswith('/validar/'):
+            return 404, {'error': f"ruta desconocida: {path}"}, None
+        if method != 'POST':
+            return 405, {'error': "use POST"}, None
+
+        name = path[len('/validar/'):]
+        if name not in self.tablas:
+            return 404, {'error': f"autómata desconocido: {name}"}, None
+        try:
+            request = json.loads(body or b'{}')
+        except ValueError:
+            return 400, {'error': "el cuerpo no es JSON válido"}, None
+        if not isinstance(request, dict):
+            request = {}
+
+        if isinstance(request.get('cadena'), str):
+            if len(request['cadena']) > MAX_LENGTH:
+                return 413, {'error': f"la cadena supera {MAX_LENGTH} caracteres"}, None
+            code = await self._batcher(name).classify(request['cadena'])
+            self.counts['cadenas'] += 1
+            return 200, {'resultado': RESULT_LABELS[code]}, 'individual'
+        cadenas = request.get('cadenas')
+        if isinstance(cadenas, list) and all(isinstance(s, str) for s in cadenas):
+            if len(cadenas) > MAX_ITEMS:
+                return 413, {'error': f"el lote supera {MAX_ITEMS} cadenas"}, None
+            if any(len(s) > MAX_LENGTH for s in cadenas):
+                return 413, {'error': f"una cadena supera {MAX_LENGTH} caracteres"}, None
+            classify_batch = self.tablas[name].classify_batch
+            if len(cadenas) > INLINE_ITEMS:
+                codes = await asyncio.get_running_loop().run_in_executor(
+                    None, classify_dedup, classify_batch, cadenas)
+            else:
+                codes = classify_dedup(classify_batch, cadenas)
+            self.counts['cadenas'] += len(cadenas)
+            return 200, {'resultados': [RESULT_LABELS[code] for code in codes]}, 'lote'
+        return 400, {'error': "se espera {\"cadena\": str} o {\"cadenas\": [str]}"}, None
+
+    def metrics(self):
+        sizes = [size for batcher in self.batchers.values() for size in batcher.batch_sizes]
+        return {
+            'peticiones': dict(self.counts),
+            'latencia_ms': {kind: percentiles(samples) for kind, samples in self.latencies.items()},
+            'micro_lotes': {'cuenta': len(sizes),
+                            'tamano_medio': round(sum(sizes) / len(sizes), 2) if sizes else 0,
+                            'tamano_max': max(sizes, default=0)},
+        }
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, _ = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                length = headers.get('content-length', '0')
+                length = int(length) if length.isdigit() else -1
+                if not 0 <= length <= MAX_BODY:
+                    # El cuerpo no se lee: se responde y se cierra la conexión.
+                    status = 413 if length > MAX_BODY else 400
+                    writer.write(_response(status, {'error': "Content-Length inválido o mayor "
+                                                             f"que {MAX_BODY} bytes"},
+                                           keep_alive=False))
+                    await writer.drain()
+                    break
+                body = await reader.readexactly(length)
+
+                started = time.perf_counter_ns()
+                status, payload, kind = await self.route(method, path, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if kind:
+                    self.counts[kind] += 1
+                    self.latencies[kind].append(time.perf_counter_ns() - started)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8080, unix=None):
+        if unix:
+            server = await asyncio.start_unix_server(self.handle, path=unix)
+            where = unix
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            where = f"http://{host}:{port}"
+        print(f"Validando {', '.join(sorted(self.tablas))} en {where}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+
+def _response(status, payload, keep_alive=True):
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    head = (f"HTTP/1.1 {status} {STATUS[status]}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n")
+    if not keep_alive:
+        head += "Connection: close\r\n"
+    return head.encode('latin-1') + b"\r\n" + body
+
+
+# --- cliente y generador de carga -------------------------------------
+
+
+async def _connect(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection(args.host, args.puerto)
+
+
+async def request(reader, writer, method, path, payload=None):
+    """Petición HTTP sobre una conexión persistente; devuelve
+    ``(status, json)``."""
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+                 .encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        if key.strip().lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def load_test(args):
+    """Envía ``args.cadenas`` validaciones con ``args.concurrencia``
+    conexiones y compara cada respuesta con la tabla local."""
+    from generador import CorpusGenerator
+
+    tabla = build_table(args.automata)
+    corpus = list(CorpusGenerator(tabla, seed=args.semilla).lines(args.cadenas, args.rechazadas))
+    expected = [RESULT_LABELS[code] for code in tabla.classify_batch(corpus)]
+    path = f"/validar/{args.automata}"
+    size = max(args.lote, 1)
+    chunks = iter(range(0, len(corpus), size))
+    latencies = []
+    mismatches = 0
+
+    async def worker():
+        nonlocal mismatches
+        reader, writer = await _connect(args)
+        try:
+            for start in chunks:
+                started = time.perf_counter_ns()
+                if args.lote:
+                    _, answer = await request(reader, writer, 'POST', path,
+                                              {'cadenas': corpus[start:start + size]})
+                    results = answer['resultados']
+                else:
+                    _, answer = await request(reader, writer, 'POST', path,
+                                              {'cadena': corpus[start]})
+                    results = [answer['resultado']]
+                latencies.append(time.perf_counter_ns() - started)
+                mismatches += sum(a != b for a, b in zip(results, expected[start:start + size]))
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrencia)))
+    elapsed = time.perf_counter() - started
+
+    reader, writer = await _connect(args)
+    _, server_metrics = await request(reader, writer, 'GET', '/metricas')
+    writer.close()
+
+    report = {
+        'cadenas': len(corpus),
+        'peticiones': len(latencies),
+        'segundos': round(elapsed, 3),
+        'cadenas_por_s': round(len(corpus) / elapsed),
+        'latencia_cliente_ms': percentiles(latencies),
+        'discrepancias': mismatches,
+        'servidor': server_metrics,
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 1 if mismatches else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio local de validación de cadenas.")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    for name, description in (('servir', "inicia el servicio"),
+                              ('carga', "genera carga contra un servicio en marcha")):
+        command = sub.add_parser(name, help=description)
+        command.add_argument('--host', default='127.0.0.1')
+        command.add_argument('--puerto', type=int, default=8080)
+        command.add_argument('--unix', metavar='RUTA', help="socket Unix en lugar de TCP")
+
+    servir = sub.choices['servir']
+    servir.add_argument('--lote-max', type=int, default=MAX_BATCH,
+                        help="cadenas por micro-lote como máximo")
+    servir.add_argument('--espera-ms', type=float, default=MAX_DELAY_MS,
+                        help="espera máxima para completar un micro-lote")
+
+    carga = sub.choices['carga']
+    carga.add_argument('--automata', choices=VALIDATORS, default='correos')
+    carga.add_argument('-n', '--cadenas', type=int, default=20000)
+    carga.add_argument('-c', '--concurrencia', type=int, default=64,
+                       help="conexiones simultáneas")
+    carga.add_argument('--lote', type=int, default=0,
+                       help="cadenas por petición (0 = peticiones individuales)")
+    carga.add_argument('--rechazadas', type=float, default=0.3)
+    carga.add_argument('--semilla', type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.comando == 'carga':
+        return asyncio.run(load_test(args))
+
+    async def run():
+        await Servicio(max_batch=args.lote_max, max_delay_ms=args.espera_ms).serve(
+            args.host, args.puerto, args.unix)
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
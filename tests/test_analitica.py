@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+from analitica import LanguageCounter
+from validar_lote import build_table
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_cli_prints_counts_longer_than_str_digit_limit():
+    # El conteo de longitud 2776 de correos tiene más de 4300 dígitos, el
+    # límite de ``str(int)`` desde Python 3.11.
+    process = subprocess.run([sys.executable, 'analitica.py', 'correos', '--longitudes', '2776'],
+                             cwd=ROOT, capture_output=True, text=True)
+    assert process.returncode == 0, process.stderr
+    length, digits, _ = process.stdout.splitlines()[1].split('\t')
+    assert length == '2776'
+    assert len(digits) > 4300 and digits.isdigit()
+    count = LanguageCounter(build_table('correos', minimizar=True)).count(2776)
+    assert int(digits[-18:]) == count % 10 ** 18
+
+
+def test_counts_agree_with_matrix_power_across_int64_cutoff():
+    counter = LanguageCounter(build_table('correos'))
+    cutoff = counter.int64_lengths
+    assert 38 ** cutoff <= 2 ** 63 - 1 < 38 ** (cutoff + 1)
+    counts = counter.counts(cutoff + 20)
+    for length in range(cutoff - 2, cutoff + 21):
+        assert counts[length] == counter.count(length)
+    # Pasado el corte los conteos ya no caben en int64.
+    assert counts[cutoff + 20] > 2 ** 63
@@ -0,0 +1,24 @@
+import io
+from correos import CorreoUPTC
+
+LARGA = b'x ' + b'a' * 20000 + b'@uptc.edu.co y b1@uptc.edu.co'
+
+
+def test_stream_matches_buscar_across_chunk_borders():
+    correo = CorreoUPTC()
+    data = b'a1@uptc.edu.co, zz9@uptc.edu.co.@uptc.edu.co b@@uptc.edu.co qq@uptc.edu.co'
+    esperado = correo.buscar(data)
+    assert esperado
+    for chunk_size in (1, 2, 5, 13, 1 << 20):
+        assert list(correo.buscar_en_stream(io.BytesIO(data), chunk_size)) == esperado
+
+
+def test_stream_never_reports_a_truncated_local_part():
+    correo = CorreoUPTC()
+    assert [m[:2] for m in correo.buscar(LARGA)] == [(2, 20014), (20017, 20031)]
+    # La parte local de 20000 bytes cruza bordes de bloque y supera
+    # ``max_local``: se omite en lugar de informar un sufijo suyo.
+    encontrados = list(correo.buscar_en_stream(io.BytesIO(LARGA), 4000))
+    assert [m[:2] for m in encontrados] == [(20017, 20031)]
+    # En un solo bloque sí se encuentra completa.
+    assert list(correo.buscar_en_stream(io.BytesIO(LARGA))) == correo.buscar(LARGA)
@@ -0,0 +1,115 @@
+"""Cada motor contra ``accepts_input`` de automata-lib, la referencia."""
+import io
+import pytest
+from automatas import AUTOMATAS
+from automata.fa.nfa import NFA
+from compilador import compile_matcher
+from correos import CorreoUPTC
+from generador import CorpusGenerator
+from motor import (TablaDFA, ACCEPTED, REJECTED, ERROR, determinize, determinize_cached,
+                   minimize)
+from registros import concatenate
+from validar_lote import VALIDATORS, build_table, load_dfa
+
+EXTRA = ['', 'a', 'A', '0', '1', 'ab', 'aab', 'ba', '!', 'ñ', 'AB123C ', 'a@uptc.edu.co',
+         'Ab12', 'AB@uptc.edu.co', '1010', '€0']
+
+
+def original(name):
+    return CorreoUPTC().dfa if name == 'correos' else AUTOMATAS[name]()
+
+
+def reference(automaton):
+    def accepts(s):
+        try:
+            return automaton.accepts_input(s)
+        except Exception:
+            return False
+    return accepts
+
+
+def corpus(name):
+    generator = CorpusGenerator(build_table(name), seed=7)
+    return list(generator.lines(400, 0.5)) + EXTRA
+
+
+def expected_codes(automaton, strings):
+    accepts = reference(automaton)
+    alphabet = set(automaton.input_symbols)
+    return [ACCEPTED if accepts(s) else ERROR if not alphabet.issuperset(s) else REJECTED
+            for s in strings]
+
+
+def tables(name, tmp_path):
+    tabla = build_table(name)
+    path = tmp_path / f'{name}.afd'
+    tabla.save(str(path))
+    yield 'tabla', tabla
+    yield 'minimizada', build_table(name, minimizar=True)
+    yield 'cargada', TablaDFA.load(str(path), use_mmap=False)
+    yield 'mmap', TablaDFA.load(str(path))
+    automaton = original(name)
+    if isinstance(automaton, NFA):
+        yield 'determinizada', TablaDFA(determinize(automaton))
+        yield 'en caché', TablaDFA(determinize_cached(automaton, str(tmp_path / 'cache')))
+
+
+@pytest.mark.parametrize('name', VALIDATORS)
+def test_engines_agree_with_accepts_input(name, tmp_path):
+    strings = corpus(name)
+    codes = expected_codes(original(name), strings)
+    assert ACCEPTED in codes and REJECTED in codes and ERROR in codes
+    accepted = [code == ACCEPTED for code in codes]
+
+    for engine, tabla in tables(name, tmp_path):
+        assert [tabla.classify(s) for s in strings] == codes, engine
+        assert [tabla.accepts(s) for s in strings] == accepted, engine
+        assert tabla.accepts_batch(strings).tolist() == accepted, engine
+        assert tabla.classify_batch(strings).tolist() == codes, engine
+        matcher = compile_matcher(tabla)
+        assert [matcher.classify(s) for s in strings] == codes, engine
+        assert [matcher.accepts(s) for s in strings] == accepted, engine
+
+
+@pytest.mark.parametrize('name', VALIDATORS)
+def test_minimize_is_no_larger_and_idempotent(name):
+    dfa = load_dfa(name)
+    minimal = minimize(dfa)
+    assert len(minimal.states) <= len(dfa.states)
+    assert len(minimize(minimal).states) == len(minimal.states)
+
+
+@pytest.mark.parametrize('use_mmap', [False, True])
+def test_save_load_keeps_tuple_and_frozenset_state_names(use_mmap, tmp_path):
+    # Estados ``(campo, frozenset)`` del NFA determinizado y ``(campo, 'C3')``.
+    tabla = TablaDFA(concatenate([load_dfa('contrasenas'), load_dfa('pos')]))
+    fields = [state[1] for state in tabla.states if isinstance(state, tuple)]
+    assert any(isinstance(field, frozenset) for field in fields)
+    assert any(isinstance(field, str) for field in fields)
+    path = tmp_path / 'registros.afd'
+    tabla.save(str(path))
+    loaded = TablaDFA.load(str(path), use_mmap=use_mmap)
+
+    assert loaded.states == tabla.states
+    assert [type(state[1]) for state in loaded.states if isinstance(state, tuple)] == \
+        [type(field) for field in fields]
+    assert list(loaded.table) == list(tabla.table)
+    assert loaded.final == tabla.final
+    for record in ['Ab12,AB123C', 'Ab12,AB1', 'Ab,AB123C', 'Ab12;AB123C']:
+        assert loaded.run(record) == tabla.run(record)
+
+
+def test_search_finds_the_accepted_addresses(tmp_path):
+    correo = CorreoUPTC()
+    strings = corpus('correos')
+    accepted = [s for s in strings if reference(correo.dfa)(s)]
+    texto = ', '.join(accepted).encode('utf-8')
+    assert [direccion for _, _, direccion in correo.buscar(texto)] == accepted
+
+    # Con los rechazados de por medio, las tres búsquedas coinciden.
+    texto = ' '.join(strings).encode('utf-8')
+    path = tmp_path / 'texto.log'
+    path.write_bytes(texto)
+    assert correo.buscar_en_archivo(str(path)) == correo.buscar(texto)
+    for chunk_size in (7, 64, 1 << 20):
+        assert list(correo.buscar_en_stream(io.BytesIO(texto), chunk_size)) == correo.buscar(texto)
@@ -0,0 +1,322 @@
+"""Validación en lote desde la línea de comandos, sin interfaz gráfica.
+
+Lee las cadenas línea por línea desde un archivo o desde stdin y escribe un
+resultado (ACEPTADA, RECHAZADA o ERROR) por cada línea no vacía, en JSONL o
+CSV. La memoria usada no depende del tamaño de la entrada. Con ``-p`` el
+archivo se reparte en fragmentos que se validan en varios procesos.
+
+    python validar_lote.py pos codigos.txt -f csv -o resultados.csv
+    python validar_lote.py binario cadenas.txt -p 8 -o resultados.jsonl
+    cat correos.txt | python validar_lote.py correos
+"""
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+from automata.fa.nfa import NFA
+from automatas import AUTOMATAS
+from cache import ResultCache
+from compilador import compile_matcher
+from correos import CorreoUPTC
+from metricas import Metricas
+from motor import (TablaDFA, Resultado, determinize_cached, minimize, state_label,
+                   ACCEPTED, REJECTED, ERROR, RESULT_LABELS)
+
+VALIDATORS = sorted(AUTOMATAS) + ['correos']
+# Todos los modos parten las líneas solo en '\n' y recortan los mismos
+# espacios ASCII que ``bytes.strip``; así un '\r' suelto o un separador
+# Unicode dan el mismo resultado en serie, en paralelo y en bytes.
+BLANKS = ' \t\n\r\x0b\x0c'
+
+
+def load_dfa(name):
+    """DFA del autómata ``name``; los NFA se determinizan (con caché)."""
+    if name == 'correos':
+        return CorreoUPTC().dfa
+    automaton = AUTOMATAS[name]()
+    if isinstance(automaton, NFA):
+        return determinize_cached(automaton)
+    return automaton
+
+
+def build_table(name, minimizar=False):
+    """Compila el autómata ``name`` a TablaDFA, minimizado si se pide."""
+    dfa = load_dfa(name)
+    return TablaDFA(minimize(dfa) if minimizar else dfa)
+
+
+def validate_lines(lines, classify, first_line=1):
+    """Genera ``(linea, cadena, resultado)`` por cada línea no vacía,
+    numerando las líneas como en el archivo original. ``resultado`` es el
+    código de ``classify`` o, en modo diagnóstico, un ``Resultado``."""
+    for number, line in enumerate(lines, start=first_line):
+        cadena = line.strip(BLANKS)
+        if cadena:
+            yield number, cadena, classify(cadena)
+
+
+def validate_byte_lines(lines, classify_bytes, first_line=1):
+    """Como ``validate_lines`` pero con líneas en bytes: se validan sin
+    decodificar y solo se decodifica la cadena para escribirla."""
+    for number, line in enumerate(lines, start=first_line):
+        raw = line.strip()  # mismos espacios que BLANKS
+        if raw:
+            yield number, raw.decode('utf-8', errors='replace'), classify_bytes(raw)
+
+
+def write_jsonl(out, results):
+    for number, cadena, outcome in results:
+        if isinstance(outcome, Resultado):
+            record = {'linea': number, 'cadena': cadena, 'resultado': RESULT_LABELS[outcome.code],
+                      'estado': state_label(outcome.state), 'posicion': outcome.position}
+            code = outcome.code
+        else:
+            record = {'linea': number, 'cadena': cadena, 'resultado': RESULT_LABELS[outcome]}
+            code = outcome
+        out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        yield code
+
+
+def write_csv(out, results):
+    writer = csv.writer(out, lineterminator='\n')
+    for number, cadena, outcome in results:
+        if isinstance(outcome, Resultado):
+            writer.writerow([number, cadena, RESULT_LABELS[outcome.code],
+                             state_label(outcome.state), outcome.position])
+            yield outcome.code
+        else:
+            writer.writerow([number, cadena, RESULT_LABELS[outcome]])
+            yield outcome
+
+
+WRITERS = {'jsonl': write_jsonl, 'csv': write_csv}
+
+
+def header(formato, diagnostico=False):
+    if formato != 'csv':
+        return ''
+    return 'linea,cadena,resultado,estado,posicion\n' if diagnostico else 'linea,cadena,resultado\n'
+
+SHARD_BYTES = 8 * 1024 * 1024
+
+
+def shard_ranges(path, n_shards):
+    """Parte el archivo en ``n_shards`` rangos de bytes ``(inicio, fin)`` que
+    empiezan siempre al comienzo de una línea."""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, n_shards):
+            f.seek(max(size * i // n_shards, bounds[-1]))
+            f.readline()
+            bounds.append(min(f.tell(), size))
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def _read_range(path, start, end):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return f.read(end - start)
+
+
+def _count_lines(task):
+    path, start, end = task
+    return _read_range(path, start, end).count(b'\n')
+
+
+_worker_classify = None
+_worker_classify_bytes = None
+
+
+def make_classifier(tabla, motor='tabla', diagnostico=False):
+    """``classify`` del motor elegido: la tabla o el código generado. En
+    modo diagnóstico se usa ``TablaDFA.run``, que además informa el estado
+    final y la posición del primer carácter que impidió aceptar."""
+    if diagnostico:
+        return tabla.run
+    return compile_matcher(tabla).classify if motor == 'codigo' else tabla.classify
+
+
+def make_byte_classifier(tabla, motor='tabla', diagnostico=False):
+    """``TablaDFA.classify_bytes`` si la tabla tiene alfabeto ASCII y se usa
+    el motor de tabla; si no, None y se valida sobre texto."""
+    if diagnostico or motor != 'tabla' or tabla.byte_classes is None:
+        return None
+    return tabla.classify_bytes
+
+
+def with_cache(classify, entries):
+    """``classify`` detrás de una ``ResultCache`` de ``entries`` entradas
+    (sin caché si es 0 o si no hay función)."""
+    if not entries or classify is None:
+        return classify
+    return ResultCache(classify, max_entries=entries)
+
+
+def _init_worker(table_path, motor, diagnostico, cache=0):
+    global _worker_classify, _worker_classify_bytes
+    tabla = TablaDFA.load(table_path)
+    _worker_classify = with_cache(make_classifier(tabla, motor, diagnostico), cache)
+    _worker_classify_bytes = with_cache(make_byte_classifier(tabla, motor, diagnostico), cache)
+
+
+def _validate_shard(task):
+    """Valida un fragmento en un proceso del pool; devuelve el texto ya
+    formateado y el conteo de resultados."""
+    path, start, end, first_line, formato = task
+    data = _read_range(path, start, end)
+    if _worker_classify_bytes is not None:
+        results = validate_byte_lines(data.split(b'\n'), _worker_classify_bytes, first_line)
+    else:
+        lines = data.decode('utf-8', errors='replace').split('\n')
+        results = validate_lines(lines, _worker_classify, first_line)
+    out = io.StringIO()
+    counts = [0, 0, 0]
+    for code in WRITERS[formato](out, results):
+        counts[code] += 1
+    return out.getvalue(), counts
+
+
+def validate_parallel(name, path, out, formato, workers, minimizar=False, motor='tabla',
+                      diagnostico=False, cache=0):
+    """Valida ``path`` repartiendo fragmentos entre ``workers`` procesos y
+    escribe los resultados en el orden original de las líneas.
+
+    La tabla se compila una vez y se guarda en un archivo temporal que cada
+    proceso proyecta en memoria con ``TablaDFA.load``.
+    """
+    fd, table_path = tempfile.mkstemp(suffix='.afd')
+    os.close(fd)
+    try:
+        build_table(name, minimizar).save(table_path)
+        return _validate_shards(table_path, path, out, formato, workers, (motor, diagnostico, cache))
+    finally:
+        os.remove(table_path)
+
+
+def _validate_shards(table_path, path, out, formato, workers, options):
+    n_shards = max(workers * 4, os.path.getsize(path) // SHARD_BYTES + 1)
+    shards = shard_ranges(path, n_shards)
+    counts = [0, 0, 0]
+
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(table_path, *options)) as pool:
+        line_counts = pool.map(_count_lines, [(path, start, end) for start, end in shards])
+        tasks = []
+        first_line = 1
+        for (start, end), n_lines in zip(shards, line_counts):
+            tasks.append((path, start, end, first_line, formato))
+            first_line += n_lines
+
+        for text, shard_counts in pool.imap(_validate_shard, tasks):
+            out.write(text)
+            for code, count in enumerate(shard_counts):
+                counts[code] += count
+    return counts
+
+
+def open_input(path, binario=False):
+    if path == '-':
+        if binario:
+            return sys.stdin.buffer
+        return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', errors='replace',
+                                newline='\n')
+    if binario:
+        return open(path, 'rb')
+    return open(path, 'r', encoding='utf-8', errors='replace', newline='\n')
+
+
+def open_output(path):
+    if path == '-':
+        return io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Valida cadenas en lote sin interfaz gráfica.")
+    parser.add_argument('automata', choices=VALIDATORS,
+                        help="autómata con el que se valida cada línea")
+    parser.add_argument('entrada', nargs='?', default='-',
+                        help="archivo de entrada, una cadena por línea ('-' para stdin)")
+    parser.add_argument('-o', '--salida', default='-',
+                        help="archivo de salida ('-' para stdout)")
+    parser.add_argument('-f', '--formato', choices=sorted(WRITERS), default='jsonl',
+                        help="formato de salida")
+    parser.add_argument('-m', '--minimizar', action='store_true',
+                        help="minimiza el DFA (Hopcroft) antes de validar")
+    parser.add_argument('--motor', choices=['tabla', 'codigo'], default='tabla',
+                        help="motor de validación: tabla de transiciones o código Python generado")
+    parser.add_argument('-d', '--diagnostico', action='store_true',
+                        help="agrega el estado final y la posición del primer carácter que "
+                             "impidió aceptar la cadena")
+    parser.add_argument('-p', '--procesos', type=int, default=1,
+                        help="procesos para validar en paralelo (0 = todos los núcleos); "
+                             "requiere un archivo de entrada")
+    parser.add_argument('--cache', type=int, default=0, metavar='ENTRADAS',
+                        help="caché LRU de resultados con ese máximo de entradas (0 = sin caché); "
+                             "útil cuando las cadenas se repiten mucho")
+    parser.add_argument('--metricas', metavar='ARCHIVO',
+                        help="instrumenta la validación y guarda las métricas (Prometheus si "
+                             "termina en .prom, JSON si no)")
+    args = parser.parse_intermixed_args(argv)
+    if args.procesos == 0:
+        args.procesos = os.cpu_count() or 1
+    if args.procesos > 1 and args.entrada == '-':
+        parser.error("la validación en paralelo necesita un archivo de entrada, no stdin")
+    if args.metricas and (args.procesos > 1 or args.diagnostico or args.motor != 'tabla'):
+        parser.error("--metricas solo funciona con un proceso, el motor de tabla y sin -d")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.minimizar:
+        dfa = load_dfa(args.automata)
+        print(f"Minimización: {len(dfa.states)} -> {len(minimize(dfa).states)} estados",
+              file=sys.stderr)
+
+    if args.procesos > 1:
+        with open_output(args.salida) as out:
+            out.write(header(args.formato, args.diagnostico))
+            counts = validate_parallel(args.automata, args.entrada, out,
+                                       args.formato, args.procesos, args.minimizar, args.motor,
+                                       args.diagnostico, args.cache)
+    else:
+        tabla = build_table(args.automata, args.minimizar)
+        classify_bytes = make_byte_classifier(tabla, args.motor, args.diagnostico)
+        metricas = None
+        if args.metricas:
+            metricas = Metricas(tabla, args.automata)
+            classify_bytes = None
+        counts = [0, 0, 0]
+        with open_input(args.entrada, classify_bytes is not None) as f, \
+                open_output(args.salida) as out:
+            out.write(header(args.formato, args.diagnostico))
+            if classify_bytes is not None:
+                classify = with_cache(classify_bytes, args.cache)
+                results = validate_byte_lines(f, classify)
+            else:
+                classify = make_classifier(tabla, args.motor, args.diagnostico)
+                classify = with_cache(metricas.classify if metricas else classify, args.cache)
+                results = validate_lines(f, classify)
+            for code in WRITERS[args.formato](out, results):
+                counts[code] += 1
+        if metricas:
+            metricas.save(args.metricas)
+        if isinstance(classify, ResultCache):
+            stats = classify.stats()
+            print(f"Caché: {stats['aciertos']} aciertos, {stats['fallos']} fallos, "
+                  f"{stats['desalojos']} desalojos", file=sys.stderr)
+
+    print(", ".join(f"{RESULT_LABELS[code]}: {counts[code]}" for code in (ACCEPTED, REJECTED, ERROR)),
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
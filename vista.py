@@ -0,0 +1,588 @@
+"""Piezas de interfaz compartidas por los visores de autómatas."""
+import bisect
+import os
+import queue
+import threading
+import time
+import tkinter as tk
+from array import array
+from tkinter import ttk, messagebox, filedialog
+from tkinter import font as tkfont
+import numpy as np
+from cache import ResultCache
+from diagrama import figure_path
+from metricas import Metricas
+from motor import ACCEPTED, REJECTED, ERROR, RESULT_LABELS, atomic_write
+
+
+class LiveValidator:
+    """Valida la cadena de la entrada mientras se escribe.
+
+    Guarda el estado de la tabla después de cada prefijo (``path[i]`` es el
+    estado tras leer ``i`` caracteres). Al escribir al final solo se avanza
+    un símbolo; al borrar o pegar se retoma desde el primer carácter que
+    cambió.
+    """
+
+    def __init__(self, tabla):
+        self.tabla = tabla
+        self.text = ''
+        self.path = [tabla.initial]
+
+    def update(self, text):
+        """Devuelve ``(codigo, estado)`` para ``text``: el código como en
+        ``TablaDFA.classify`` y el desplazamiento del estado actual."""
+        if text.startswith(self.text):
+            same = len(self.text)
+        else:
+            same = len(os.path.commonprefix([self.text, text]))
+        del self.path[same + 1:]
+
+        tabla = self.tabla
+        table = tabla.table
+        index = tabla.symbol_index
+        invalid = tabla.invalid_class
+        state = self.path[-1]
+        for ch in text[same:]:
+            state = table[state + index.get(ch, invalid)]
+            self.path.append(state)
+        self.text = text
+
+        if state == tabla.error_state:
+            return ERROR, state
+        return (ACCEPTED if state in tabla.final else REJECTED), state
+
+
+class StateMarker:
+    """Anillo que resalta en el grafo del visor los estados activos."""
+
+    def __init__(self, ax, canvas, pos):
+        self.canvas = canvas
+        self.pos = pos
+        self.artist = ax.scatter([], [], s=1500, facecolors='none', edgecolors='#C0392B',
+                                 linewidths=3, zorder=5)
+
+    def show(self, state):
+        """``state`` es un nombre de estado, un frozenset de estados del NFA
+        (estados del DFA por subconjuntos) o None para el sumidero."""
+        states = state if isinstance(state, frozenset) else [state]
+        points = [self.pos[s] for s in states if s in self.pos]
+        self.artist.set_offsets(np.array(points, dtype=float).reshape(-1, 2))
+        self.canvas.draw_idle()
+
+
+class HeatmapLayer:
+    """Colorea los nodos del grafo según las visitas de cada estado
+    (``metricas.Metricas.visits_by_state``), en escala logarítmica."""
+
+    def __init__(self, ax, canvas, pos):
+        self.ax = ax
+        self.canvas = canvas
+        self.pos = pos
+        self.artist = None
+
+    def show(self, visits):
+        totals = dict.fromkeys(self.pos, 0)
+        for state, n in visits.items():
+            for name in (state if isinstance(state, frozenset) else [state]):
+                if name in totals:
+                    totals[name] += n
+
+        if self.artist is not None:
+            self.artist.remove()
+        names = list(totals)
+        self.artist = self.ax.scatter([self.pos[name][0] for name in names],
+                                      [self.pos[name][1] for name in names],
+                                      c=np.log1p([totals[name] for name in names]),
+                                      cmap='YlOrRd', s=1000, zorder=2.5)
+        self.canvas.draw_idle()
+
+
+class DiagramPanel:
+    """Grafo del autómata en ``frame`` sin demorar el arranque del visor.
+
+    Si existe el PNG ``png_path`` de una ejecución anterior se muestra de
+    inmediato (Tk lo lee sin matplotlib). Un hilo importa matplotlib, arma
+    la figura con ``build(fig)`` (que devuelve ``(ax, pos)``) y guarda el
+    PNG si faltaba; al terminar, la imagen se reemplaza por el lienzo con
+    ``StateMarker`` y ``HeatmapLayer``. Mientras tanto ``show_state`` y
+    ``show_heatmap`` solo recuerdan el último valor pedido.
+    """
+
+    POLL_MS = 50
+
+    def __init__(self, frame, png_path, build, initial_state):
+        self.frame = frame
+        self.png_path = png_path
+        self.build = build
+        self.state = initial_state
+        self.visits = None
+        self.marker = None
+        self.heatmap = None
+        self.queue = queue.Queue(maxsize=1)
+
+        self.placeholder = tk.Label(frame, text="Dibujando el autómata...", bg=frame['bg'],
+                                    font=('Arial', 11))
+        if png_path and os.path.exists(png_path):
+            try:
+                self.image = tk.PhotoImage(file=png_path)
+                self.placeholder.config(image=self.image)
+            except tk.TclError:
+                pass
+        self.placeholder.pack(fill=tk.BOTH, expand=True)
+
+        threading.Thread(target=self._work, daemon=True).start()
+        frame.after(self.POLL_MS, self._poll)
+
+    def _work(self):
+        """Hilo de dibujo: no toca Tk; deja la figura (o el error) en la cola."""
+        try:
+            from matplotlib.figure import Figure
+
+            fig = Figure(figsize=(6, 5))
+            ax, pos = self.build(fig)
+            if self.png_path and not os.path.exists(self.png_path):
+                try:
+                    os.makedirs(os.path.dirname(self.png_path), exist_ok=True)
+                    with atomic_write(self.png_path) as f:
+                        fig.savefig(f, format='png', facecolor=fig.get_facecolor())
+                except OSError:
+                    pass
+            self.queue.put(('done', fig, ax, pos))
+        except Exception as e:
+            self.queue.put(('error', e))
+
+    def _poll(self):
+        try:
+            message = self.queue.get_nowait()
+        except queue.Empty:
+            self.frame.after(self.POLL_MS, self._poll)
+            return
+        if message[0] == 'error':
+            self.placeholder.config(image='', text=f"No se pudo dibujar el autómata: {message[1]}")
+            return
+
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        _, fig, ax, pos = message
+        canvas = FigureCanvasTkAgg(fig, self.frame)
+        self.heatmap = HeatmapLayer(ax, canvas, pos)
+        self.marker = StateMarker(ax, canvas, pos)
+        self.marker.show(self.state)
+        if self.visits is not None:
+            self.heatmap.show(self.visits)
+        canvas.draw()
+        self.placeholder.destroy()
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+    def show_state(self, state):
+        self.state = state
+        if self.marker is not None:
+            self.marker.show(state)
+
+    def show_heatmap(self, visits):
+        self.visits = visits
+        if self.heatmap is not None:
+            self.heatmap.show(visits)
+
+
+class ResultsWindow:
+    """Ventana "Cadenas leidas" que se llena de forma progresiva.
+
+    Un hilo lee y valida el archivo; los resultados llegan por una cola y el
+    bucle de eventos de Tk los va agregando sin congelar la aplicación.
+
+    La tabla es virtual: por cada línea solo se guarda su desplazamiento en
+    el archivo (``offsets``) y un byte con el resultado (``codes``); el
+    Treeview tiene únicamente las filas visibles, cuyo texto se vuelve a
+    leer del archivo al desplazarse.
+    """
+
+    CHUNK = 5000
+    POLL_MS = 30
+    BUDGET_MS = 25
+    HEADER_HEIGHT = 25
+
+    def __init__(self, root, filename, classify, geometry="650x450", on_done=None):
+        self.filename = filename
+        self.classify = classify
+        self.on_done = on_done
+        self.counts = [0, 0, 0]
+        self.queue = queue.Queue(maxsize=64)
+        self.cancelled = threading.Event()
+
+        self.offsets = array('q')
+        self.codes = bytearray()
+        self.filtered = None
+        self.top = 0
+        self.items = []
+        try:
+            self.source = open(filename, 'rb')
+        except OSError as e:
+            # Archivo ilegible o borrado: el mismo aviso que antes, sin ventana.
+            messagebox.showerror("Error", f"Error al cargar archivo: {str(e)}", parent=root)
+            self.window = None
+            return
+
+        self.window = tk.Toplevel(root)
+        self.window.title("Cadenas leidas")
+        self.window.geometry(geometry)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        tools_frame = tk.Frame(self.window)
+        tools_frame.pack(side=tk.TOP, fill=tk.X, padx=10, pady=(10, 0))
+
+        tk.Label(tools_frame, text="Ir a línea:", font=('Arial', 10)).pack(side=tk.LEFT)
+        self.line_entry = tk.Entry(tools_frame, width=10)
+        self.line_entry.pack(side=tk.LEFT, padx=5)
+        self.line_entry.bind('<Return>', lambda event: self.jump_to_line())
+        tk.Button(tools_frame, text="Ir", command=self.jump_to_line,
+                  font=('Arial', 10, 'bold')).pack(side=tk.LEFT)
+
+        self.only_rejected = tk.BooleanVar(value=False)
+        tk.Checkbutton(tools_frame, text="Solo rechazadas", variable=self.only_rejected,
+                       command=self.toggle_filter, font=('Arial', 10)).pack(side=tk.RIGHT)
+
+        status_frame = tk.Frame(self.window)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=(0, 10))
+
+        self.progress = ttk.Progressbar(status_frame, mode='determinate')
+        self.progress.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        self.cancel_button = tk.Button(status_frame, text="Cancelar", command=self.cancel,
+                                       font=('Arial', 10, 'bold'))
+        self.cancel_button.pack(side=tk.RIGHT, padx=(10, 0))
+
+        self.status_label = tk.Label(self.window, text="Validando...", font=('Arial', 10))
+        self.status_label.pack(side=tk.BOTTOM, fill=tk.X, padx=10)
+
+        main_frame = tk.Frame(self.window)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        self.tree = ttk.Treeview(main_frame, columns=("Numero", "Cadena", "Resultado"), show="headings",
+                                 height=15, selectmode='browse')
+        self.tree.heading("Numero", text="#")
+        self.tree.heading("Cadena", text="Cadena")
+        self.tree.heading("Resultado", text="Resultado")
+
+        self.tree.column("Numero", width=70, anchor="center")
+        self.tree.column("Cadena", width=250, anchor="center")
+        self.tree.column("Resultado", width=150, anchor="center")
+
+        self.scrollbar = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=self._on_scrollbar)
+
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.row_height = self._row_height()
+        self.tree.bind('<Configure>', self._on_resize)
+        self.tree.bind('<MouseWheel>', lambda event: self.scroll_to(self.top - event.delta // 120 * 3))
+        self.tree.bind('<Button-4>', lambda event: self.scroll_to(self.top - 3))
+        self.tree.bind('<Button-5>', lambda event: self.scroll_to(self.top + 3))
+        self.tree.bind('<Prior>', lambda event: self.scroll_to(self.top - len(self.items)))
+        self.tree.bind('<Next>', lambda event: self.scroll_to(self.top + len(self.items)))
+        self._set_rows(15)
+
+        self.worker = threading.Thread(target=self._work, daemon=True)
+        self.worker.start()
+        self.window.after(self.POLL_MS, self._poll)
+
+    # --- tabla virtual -------------------------------------------------
+
+    def _view_size(self):
+        return len(self.codes) if self.filtered is None else len(self.filtered)
+
+    def _row_index(self, position):
+        return position if self.filtered is None else self.filtered[position]
+
+    def _read_line(self, idx):
+        self.source.seek(self.offsets[idx])
+        return self.source.readline().decode('utf-8', errors='replace').strip()
+
+    def _row_height(self):
+        """Alto en píxeles de una fila del Treeview: el ``rowheight`` del tema
+        o, si el tema no lo fija, el alto de línea de su fuente (lo que usa Tk)."""
+        style = ttk.Style(self.window)
+        try:
+            return max(1, int(style.lookup('Treeview', 'rowheight')))
+        except (TypeError, ValueError, tk.TclError):
+            font = tkfont.Font(root=self.window, font=style.lookup('Treeview', 'font') or 'TkDefaultFont')
+            return max(1, font.metrics('linespace'))
+
+    def _set_rows(self, n_rows):
+        while len(self.items) < n_rows:
+            self.items.append(self.tree.insert("", "end", values=("", "", "")))
+        while len(self.items) > n_rows:
+            self.tree.delete(self.items.pop())
+
+    def _on_resize(self, event):
+        n_rows = max(1, (event.height - self.HEADER_HEIGHT) // self.row_height)
+        if n_rows != len(self.items):
+            self._set_rows(n_rows)
+            self.scroll_to(self.top)
+
+    def _on_scrollbar(self, *args):
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * self._view_size()))
+        elif args[0] == 'scroll':
+            step = len(self.items) if args[2] == 'pages' else 1
+            self.scroll_to(self.top + int(args[1]) * step)
+
+    def scroll_to(self, top):
+        self.top = max(0, min(top, self._view_size() - len(self.items)))
+        self.refresh()
+
+    def refresh(self):
+        """Vuelve a llenar solo las filas visibles del Treeview."""
+        size = self._view_size()
+        for i, iid in enumerate(self.items):
+            position = self.top + i
+            if position < size:
+                idx = self._row_index(position)
+                self.tree.item(iid, values=(idx + 1, self._read_line(idx), RESULT_LABELS[self.codes[idx]]))
+            else:
+                self.tree.item(iid, values=("", "", ""))
+
+        if size:
+            self.scrollbar.set(self.top / size, min(1.0, (self.top + len(self.items)) / size))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _rejected_since(self, start):
+        codes = np.frombuffer(self.codes[start:], dtype=np.uint8)
+        return array('q', (np.flatnonzero(codes != ACCEPTED) + start).tolist())
+
+    def toggle_filter(self):
+        first = self._row_index(self.top) if self._view_size() else 0
+        self.filtered = self._rejected_since(0) if self.only_rejected.get() else None
+        self._scroll_to_index(first)
+
+    def _scroll_to_index(self, idx):
+        """Desplaza la vista hasta la línea ``idx`` (o la siguiente rechazada
+        si hay filtro) y devuelve su posición en la vista."""
+        position = idx if self.filtered is None else bisect.bisect_left(self.filtered, idx)
+        self.scroll_to(position)
+        return position
+
+    def jump_to_line(self):
+        try:
+            idx = int(self.line_entry.get()) - 1
+        except ValueError:
+            return
+        position = min(self._scroll_to_index(max(idx, 0)), self._view_size() - 1)
+        # Cerca del final ``scroll_to`` no deja la línea arriba: se marca la
+        # fila en la que quedó.
+        if self.items and position >= self.top:
+            self.tree.selection_set(self.items[position - self.top])
+
+    # --- validación en segundo plano -----------------------------------
+
+    def _put(self, item):
+        while not self.cancelled.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _work(self):
+        """Hilo de validación: no toca Tk, solo deja bloques en la cola."""
+        try:
+            with open(self.filename, 'rb') as f:
+                f.seek(0, 2)
+                self._put(('size', f.tell()))
+                f.seek(0)
+
+                offsets = array('q')
+                codes = bytearray()
+                offset = 0
+                for raw in f:
+                    if self.cancelled.is_set():
+                        return
+                    s = raw.decode('utf-8', errors='replace').strip()
+                    if s:
+                        offsets.append(offset)
+                        codes.append(self.classify(s))
+                        if len(codes) >= self.CHUNK:
+                            self._put(('rows', offsets, codes, offset + len(raw)))
+                            offsets = array('q')
+                            codes = bytearray()
+                    offset += len(raw)
+                self._put(('rows', offsets, codes, offset))
+            self._put(('done',))
+        except Exception as e:
+            self._put(('error', e))
+
+    def _poll(self):
+        if self.cancelled.is_set():
+            return
+        deadline = time.monotonic() + self.BUDGET_MS / 1000
+        added = False
+        finished = None
+        while time.monotonic() < deadline:
+            try:
+                message = self.queue.get_nowait()
+            except queue.Empty:
+                break
+
+            kind = message[0]
+            if kind == 'size':
+                self.progress.configure(maximum=max(message[1], 1))
+            elif kind == 'rows':
+                start = len(self.codes)
+                self.offsets.extend(message[1])
+                self.codes.extend(message[2])
+                for code in (ACCEPTED, REJECTED, ERROR):
+                    self.counts[code] += message[2].count(code)
+                if self.filtered is not None:
+                    self.filtered.extend(self._rejected_since(start))
+                self.progress.configure(value=message[3])
+                added = True
+            else:
+                finished = message
+                break
+
+        if added:
+            self.refresh()
+            self._show_counts()
+        if finished is None:
+            self.window.after(self.POLL_MS, self._poll)
+        elif finished[0] == 'done':
+            self._finish("Listo")
+            if self.on_done is not None:
+                self.on_done()
+        else:
+            self._finish("Error")
+            messagebox.showerror("Error", f"Error al cargar archivo: {str(finished[1])}",
+                                 parent=self.window)
+
+    def _show_counts(self, prefix="Validando..."):
+        self.status_label.config(
+            text=f"{prefix}  Aceptadas: {self.counts[ACCEPTED]}  "
+                 f"Rechazadas: {self.counts[REJECTED]}  Errores: {self.counts[ERROR]}")
+
+    def _finish(self, prefix):
+        self._show_counts(prefix)
+        self.cancel_button.config(state=tk.DISABLED)
+
+    def cancel(self):
+        self.cancelled.set()
+        self._finish("Cancelado")
+
+    def close(self):
+        self.cancelled.set()
+        self.source.close()
+        self.window.destroy()
+
+
+class TraceWindow:
+    """Ventana "Traza" paginada: solo se formatean las líneas de la página
+    visible de una ``motor.Traza``; la traza completa se puede exportar."""
+
+    PAGE_LINES = 200
+
+    def __init__(self, root, traza):
+        self.traza = traza
+        self.page = 0
+        self.n_pages = max(1, -(-len(traza) // self.PAGE_LINES))
+
+        self.window = tk.Toplevel(root)
+        self.window.title("Traza")
+        self.window.geometry("500x450")
+
+        tools_frame = tk.Frame(self.window)
+        tools_frame.pack(side=tk.TOP, fill=tk.X, padx=10, pady=(10, 0))
+
+        self.prev_button = tk.Button(tools_frame, text="< Anterior", font=('Arial', 10, 'bold'),
+                                     command=lambda: self.show_page(self.page - 1))
+        self.prev_button.pack(side=tk.LEFT)
+        self.page_label = tk.Label(tools_frame, font=('Arial', 10))
+        self.page_label.pack(side=tk.LEFT, padx=10)
+        self.next_button = tk.Button(tools_frame, text="Siguiente >", font=('Arial', 10, 'bold'),
+                                     command=lambda: self.show_page(self.page + 1))
+        self.next_button.pack(side=tk.LEFT)
+        tk.Button(tools_frame, text="Exportar", command=self.export,
+                  font=('Arial', 10, 'bold')).pack(side=tk.RIGHT)
+
+        text_frame = tk.Frame(self.window)
+        text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.text = tk.Text(text_frame, font=('Courier', 10), wrap=tk.NONE)
+        scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.text.yview)
+        self.text.configure(yscrollcommand=scrollbar.set)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.show_page(0)
+
+    def show_page(self, page):
+        self.page = max(0, min(page, self.n_pages - 1))
+        start = self.page * self.PAGE_LINES
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete('1.0', tk.END)
+        self.text.insert('1.0', "\n".join(self.traza.lines(start, start + self.PAGE_LINES)))
+        self.text.configure(state=tk.DISABLED)
+
+        self.page_label.config(text=f"Página {self.page + 1} de {self.n_pages}")
+        self.prev_button.config(state=tk.NORMAL if self.page > 0 else tk.DISABLED)
+        self.next_button.config(state=tk.NORMAL if self.page < self.n_pages - 1 else tk.DISABLED)
+
+    def export(self):
+        filename = filedialog.asksaveasfilename(parent=self.window, defaultextension=".txt",
+                                                filetypes=[("Text files", "*.txt")])
+        if filename:
+            try:
+                self.traza.export(filename)
+            except OSError as e:
+                messagebox.showerror("Error", f"Error al exportar la traza: {e}", parent=self.window)
+
+
+class ViewerMixin:
+    """Validación y grafo compartidos por los visores de autómatas.
+
+    El visor define ``root``, ``dfa``, ``tabla``, ``entry``, ``result_label``,
+    ``heatmap_on``, ``graph_frame`` y ``draw_dfa(fig)``, y llama a
+    ``start_viewer`` después de armar la interfaz. ``RESULTS_GEOMETRY`` es
+    el tamaño de la ventana "Cadenas leidas".
+    """
+
+    RESULTS_GEOMETRY = "650x450"
+
+    def start_viewer(self, name):
+        """``name`` distingue el PNG guardado del grafo de cada visor."""
+        # Validación en vivo: solo se recorre lo que cambió desde la última
+        # pulsación. El grafo se dibuja en segundo plano; entre tanto se
+        # muestra el PNG de la ejecución anterior.
+        self.live = LiveValidator(self.tabla)
+        self.diagram = DiagramPanel(self.graph_frame, figure_path(self.dfa, name),
+                                    self.draw_dfa, self.dfa.initial_state)
+
+    def show_result(self, code):
+        self.result_label.config(text=RESULT_LABELS[code], fg='green' if code == ACCEPTED else 'red')
+
+    def on_edit(self):
+        code, state = self.live.update(self.entry.get().strip())
+        self.show_result(code)
+        self.diagram.show_state(self.tabla.state_name(state))
+
+    def verify_string(self):
+        self.show_result(self.tabla.classify(self.entry.get().strip()))
+
+    def show_process(self):
+        # La traza se guarda por tramos y se muestra por páginas, así que
+        # también sirve para cadenas de cientos de miles de símbolos.
+        TraceWindow(self.root, self.tabla.trace(self.entry.get().strip()))
+
+    def load_file(self):
+        filename = filedialog.askopenfilename(filetypes=[("Text files", "*.txt")])
+        if not filename:
+            return
+        if self.heatmap_on.get():
+            # Validación instrumentada: al terminar, el grafo se colorea
+            # según las visitas a cada estado.
+            metricas = Metricas(self.tabla)
+            ResultsWindow(self.root, filename, metricas.classify, self.RESULTS_GEOMETRY,
+                          on_done=lambda: self.diagram.show_heatmap(metricas.visits_by_state()))
+        else:
+            # Los archivos suelen repetir cadenas: caché LRU por archivo.
+            ResultsWindow(self.root, filename, ResultCache(self.tabla.classify),
+                          self.RESULTS_GEOMETRY)